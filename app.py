@@ -1,27 +1,89 @@
 import sys
 import os
+import argparse
 from PyQt6.QtWidgets import QApplication, QSplashScreen
-from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QPixmap, QColor, QFont, QPainter, QFontMetrics, QIcon
+from PyQt6.QtCore import Qt, QTimer, QRect
+from PyQt6.QtGui import QPixmap, QFont, QPainter, QFontMetrics, QIcon
 
 
 from browser_window import WebBrowserWindow
 from ui_components import APP_ICON_SVG 
+from automation_client import DEFAULT_ADDRESS as DEFAULT_AUTOMATION_ADDRESS
+
+
+def parse_args(argv: list[str]) -> tuple[argparse.Namespace, list[str]]:
+    """Parses the browser's own options; anything unrecognised is left for Qt."""
+    parser = argparse.ArgumentParser(description="Encrypt Browser")
+    parser.add_argument("--automation", nargs="?", const=DEFAULT_AUTOMATION_ADDRESS,
+                        default=os.environ.get("ENCRYPT_BROWSER_AUTOMATION"), metavar="ADDRESS",
+                        help="Enable the local JSON-RPC automation server (unix:NAME, unix:/path or tcp:[HOST:]PORT). Off by default.")
+    parser.add_argument("--private", action="store_true",
+                        help="Start in a private window that keeps cookies, cache and storage in RAM only.")
+    parser.add_argument("--probe-rendering", action="store_true",
+                        help="Re-run the rendering backend benchmark now (with progress output) instead of using the stored result.")
+    parser.add_argument("--no-watchdog", action="store_true",
+                        help="Disable the GUI stall watchdog (e.g. while stepping through code in a debugger).")
+    return parser.parse_known_args(argv[1:])
+
+
+def configure_rendering_environment(force_probe: bool = False):
+    """Environment and application attributes that must be set before QApplication exists."""
+    # Names are needed before QApplication so the rendering config can find the user data directory
+    QApplication.setApplicationName("Encrypt Browser")
+    QApplication.setOrganizationName("NaviCodeLabs")
+
+    import render_config
+    backend = render_config.configure(force_probe=force_probe)
+    print(f"Rendering backend: {backend}")
+
+
+def run_batch_render(argv: list[str]) -> int:
+    """Entry point for `app.py render`: renders a URL list without showing the browser window."""
+    from batch_render import build_arg_parser, iter_urls, count_urls, BatchRenderer
+    from PyQt6.QtCore import QSize
+
+    args, qt_args = build_arg_parser().parse_known_args(argv)
+    configure_rendering_environment()
+    app = QApplication(sys.argv[:1] + qt_args)
+    app.setApplicationName("Encrypt Browser")
+    app.setOrganizationName("NaviCodeLabs")
 
-def main():
-    """Main function to set up and run the browser application."""
+    try:
+        total = count_urls(args.urls)
+    except OSError as e:
+        print(f"Cannot read URL list: {e}")
+        return 2
 
-    # Environment and Application Attribute Setup
+    renderer = BatchRenderer(iter_urls(args.urls), args.output_dir, format=args.format,
+                             pool_size=args.pool_size, timeout=args.timeout, retries=args.retries,
+                             viewport=QSize(args.width, args.height), settle_ms=args.settle_ms, total=total)
+    renderer.finished.connect(app.exit)
+    QTimer.singleShot(0, renderer.start)
+    return app.exec()
 
-    os.environ["QT_ANGLE_PLATFORM"] = "warp" 
 
-    os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = "--disable-gpu" 
+def main():
+    """Main function to set up and run the browser application."""
+    if len(sys.argv) > 1 and sys.argv[1] == "render":
+        sys.exit(run_batch_render(sys.argv[2:]))
+
+    args, qt_args = parse_args(sys.argv)
 
-    QApplication.setAttribute(Qt.ApplicationAttribute.AA_UseSoftwareOpenGL, True)
+    # Environment and Application Attribute Setup
+    configure_rendering_environment(force_probe=args.probe_rendering)
 
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setApplicationName("Encrypt Browser")
     app.setOrganizationName("NaviCodeLabs")
+
+    # A first-run rendering probe waits until the browser has quit, so it does not compete with this session
+    import render_config
+    app.aboutToQuit.connect(render_config.start_pending_probe)
+
+    # Palette-driven light/dark theme (follows the system color scheme by default)
+    from themes import shared_theme_manager
+    theme = shared_theme_manager()
+    theme.install(app)
     
     try:
         from ui_components import create_icon_from_svg 
@@ -44,11 +106,11 @@ def main():
         splash_height = 300
 
     splash_pixmap = QPixmap(splash_width, splash_height)
-    splash_pixmap.fill(QColor("#e8f0fe")) 
+    splash_pixmap.fill(theme.color("splash_background")) 
 
     painter = QPainter(splash_pixmap)
     painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-    painter.setPen(QColor("#005ecb"))
+    painter.setPen(theme.color("accent_pressed"))
 
     main_font = QFont("Arial", 20, QFont.Weight.Bold) 
     painter.setFont(main_font)
@@ -90,8 +152,20 @@ def main():
     app.processEvents() 
     
     # Main Window Creation and Startup
-    main_window = WebBrowserWindow() 
-
+    main_window = WebBrowserWindow(private=args.private) 
+
+    # Always-on stall detection; stalls are logged to logs/stalls.log in the user data directory
+    if not args.no_watchdog:
+        from loop_watchdog import shared_watchdog
+        watchdog = shared_watchdog()
+        watchdog.start()
+        app.aboutToQuit.connect(watchdog.stop)
+
+    if args.automation:
+        from automation import AutomationServer
+        main_window.automation_server = AutomationServer(main_window, args.automation)
+        if main_window.automation_server.start():
+            app.aboutToQuit.connect(main_window.automation_server.stop)
 
     SPLASH_DURATION_MS = 2500 
     QTimer.singleShot(SPLASH_DURATION_MS, lambda: (main_window.show(), splash.finish(main_window)))
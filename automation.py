@@ -0,0 +1,472 @@
+# automation.py
+"""
+Local JSON-RPC 2.0 automation server for scripted load and regression testing.
+
+The server is off by default and only listens on a Unix socket (or a named pipe
+on Windows) or on a loopback TCP port. Requests are newline-delimited JSON
+objects. Everything runs on the Qt event loop: slow operations such as waiting
+for a page load or running JavaScript complete through callbacks, and incoming
+requests are drained in small batches per event-loop tick, so hundreds of
+in-flight commands never block the GUI thread.
+
+A TCP connection must start with an "auth" request carrying the token that
+start() writes to a user-only file (automation_client.token_path()); any other
+first request closes the connection. Unix sockets are restricted to the current
+user by their file permissions and need no token.
+"""
+import base64
+import hmac
+import inspect
+import json
+import os
+import secrets
+import tempfile
+import time
+from collections import deque
+
+from PyQt6.QtCore import QObject, QTimer, QUrl, QBuffer, QByteArray, QIODevice
+from PyQt6.QtNetwork import QLocalServer, QTcpServer, QHostAddress
+from PyQt6.QtWebEngineWidgets import QWebEngineView
+
+from automation_client import parse_address, token_path
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+APPLICATION_ERROR = -32000
+TIMEOUT_ERROR = -32001
+UNAUTHORIZED = -32002
+
+MAX_DISPATCH_PER_TICK = 64 # Requests handled before yielding back to the event loop
+MAX_LINE_BYTES = 4 * 1024 * 1024
+
+TAB_ID_PROPERTY = "automationTabId"
+
+
+class RpcError(Exception):
+    """Raised by method handlers to answer with a JSON-RPC error object."""
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class _Connection:
+    """Buffers one client socket and writes responses back to it."""
+    def __init__(self, server: 'AutomationServer', socket, authenticated: bool):
+        self.server = server
+        self.socket = socket
+        self.buffer = bytearray()
+        self.closed = False
+        self.authenticated = authenticated
+        socket.readyRead.connect(self.on_ready_read)
+        socket.disconnected.connect(self.on_disconnected)
+
+    def on_ready_read(self):
+        self.buffer += bytes(self.socket.readAll())
+        while (newline := self.buffer.find(b"\n")) != -1:
+            line = bytes(self.buffer[:newline]).strip()
+            del self.buffer[:newline + 1]
+            if line:
+                self.server.enqueue(self, line)
+        if len(self.buffer) > MAX_LINE_BYTES:
+            self.buffer.clear()
+            self.send({"jsonrpc": "2.0", "id": None,
+                       "error": {"code": INVALID_REQUEST, "message": "Request line too long."}})
+
+    def on_disconnected(self):
+        self.closed = True
+        self.server.connections.discard(self)
+        self.socket.deleteLater()
+
+    def send(self, message: dict):
+        if self.closed:
+            return
+        self.socket.write(json.dumps(message, default=str).encode("utf-8") + b"\n")
+
+    def reject(self):
+        """Stops reading and disconnects once pending responses are written."""
+        self.closed = True
+        self.socket.readyRead.disconnect(self.on_ready_read)
+        self.socket.disconnectFromHost()
+
+
+class AutomationServer(QObject):
+    """
+    Exposes WebBrowserWindow operations to local clients. Tabs are addressed by
+    a stable integer id; methods that take an optional `tab` parameter act on the
+    current tab when it is omitted.
+    """
+    def __init__(self, main_window: 'WebBrowserWindow', address: str, parent=None): # type: ignore
+        super().__init__(parent or main_window)
+        self.main_window = main_window
+        self.address = address
+        self.connections = set()
+        self.queue = deque()
+        self.views = {} # tab id -> QWebEngineView
+        self.timings = {} # tab id -> timing dict of the last load
+        self.pending_loads = {} # tab id -> list of (respond, timer)
+        self._next_tab_id = 1
+        self._server = None
+        self._token = None
+        self._token_path = None
+
+        self._dispatch_timer = QTimer(self)
+        self._dispatch_timer.setSingleShot(True)
+        self._dispatch_timer.setInterval(0)
+        self._dispatch_timer.timeout.connect(self.dispatch_pending)
+
+        self.methods = {
+            "auth": self.rpc_auth,
+            "ping": self.rpc_ping,
+            "tabs.list": self.rpc_tabs_list,
+            "tabs.open": self.rpc_tabs_open,
+            "tabs.close": self.rpc_tabs_close,
+            "tabs.activate": self.rpc_tabs_activate,
+            "page.navigate": self.rpc_navigate,
+            "page.waitForLoad": self.rpc_wait_for_load,
+            "page.runJavaScript": self.rpc_run_javascript,
+            "page.timings": self.rpc_timings,
+            "page.screenshot": self.rpc_screenshot,
+            "userscripts.stats": self.rpc_user_script_stats,
+            "userscripts.reload": self.rpc_user_script_reload,
+            "predictor.stats": self.rpc_predictor_stats,
+            "watchdog.stats": self.rpc_watchdog_stats,
+        }
+
+        main_window.browser_view_created.connect(self.register_view)
+        for index in range(main_window.tab_widget.count()):
+            if isinstance(view := main_window.tab_widget.widget(index), QWebEngineView):
+                self.register_view(view)
+
+    # --- Server lifecycle ---
+
+    def start(self) -> bool:
+        """Starts listening. Returns False (and prints why) if the address is unusable."""
+        try:
+            kind, target = parse_address(self.address)
+        except ValueError as e:
+            print(f"Automation server not started: {e}")
+            return False
+
+        if kind == "unix":
+            server = QLocalServer(self)
+            server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+            QLocalServer.removeServer(target)
+            listening = server.listen(target)
+            description = server.fullServerName()
+        else:
+            host, port = target
+            server = QTcpServer(self)
+            bind_address = QHostAddress(QHostAddress.SpecialAddress.LocalHostIPv6 if host == "::1"
+                                        else QHostAddress.SpecialAddress.LocalHost)
+            listening = server.listen(bind_address, port)
+            description = f"{bind_address.toString()}:{server.serverPort()}"
+
+        if not listening:
+            print(f"Automation server failed to listen on {self.address}: {server.errorString()}")
+            return False
+
+        if kind == "tcp":
+            try:
+                self._token_path = self.write_token(server.serverPort())
+            except OSError as e:
+                print(f"Automation server not started: could not write its token file: {e}")
+                server.close()
+                return False
+            description += f" (token in {self._token_path})"
+
+        server.newConnection.connect(self.on_new_connection)
+        self._server = server
+        print(f"Automation server listening on {description}")
+        return True
+
+    def write_token(self, port: int) -> str:
+        """Writes a new random token to a file readable only by the current user."""
+        self._token = secrets.token_urlsafe(32)
+        path = token_path(port)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".automation-token-") # Created 0600
+        try:
+            with os.fdopen(fd, "w", encoding="ascii") as f:
+                f.write(self._token)
+            os.replace(temp_path, path)
+        except OSError:
+            os.unlink(temp_path)
+            raise
+        return path
+
+    def stop(self):
+        if self._server:
+            self._server.close()
+            self._server = None
+        if self._token_path:
+            try:
+                os.remove(self._token_path)
+            except OSError:
+                pass
+            self._token_path = None
+        for connection in list(self.connections):
+            connection.socket.close()
+
+    def on_new_connection(self):
+        while self._server and self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            self.connections.add(_Connection(self, socket, authenticated=self._token is None))
+
+    # --- Request dispatch ---
+
+    def enqueue(self, connection: _Connection, line: bytes):
+        self.queue.append((connection, line))
+        if not self._dispatch_timer.isActive():
+            self._dispatch_timer.start()
+
+    def dispatch_pending(self):
+        for _ in range(min(MAX_DISPATCH_PER_TICK, len(self.queue))):
+            connection, line = self.queue.popleft()
+            self.handle_line(connection, line)
+        if self.queue:
+            self._dispatch_timer.start()
+
+    def handle_line(self, connection: _Connection, line: bytes):
+        if connection.closed and not connection.authenticated: # Pipelined after a rejected first request
+            return
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            connection.send({"jsonrpc": "2.0", "id": None, "error": {"code": PARSE_ERROR, "message": str(e)}})
+            if not connection.authenticated:
+                connection.reject()
+            return
+
+        request_id = request.get("id") if isinstance(request, dict) else None
+        answered = False
+
+        def respond(result=None, error: RpcError | None = None):
+            nonlocal answered
+            if answered or request_id is None: # Notifications get no response
+                answered = True
+                return
+            answered = True
+            message = {"jsonrpc": "2.0", "id": request_id}
+            if error is not None:
+                message["error"] = {"code": error.code, "message": error.message}
+            else:
+                message["result"] = result
+            connection.send(message)
+
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            respond(error=RpcError(INVALID_REQUEST, "Expected an object with a 'method' string."))
+            if not connection.authenticated:
+                connection.reject()
+            return
+        params = request.get("params") or {}
+        if not isinstance(params, dict):
+            respond(error=RpcError(INVALID_PARAMS, "Params must be an object."))
+            if not connection.authenticated:
+                connection.reject()
+            return
+
+        if not connection.authenticated:
+            token = params.get("token")
+            if request["method"] != "auth" or not isinstance(token, str) \
+                    or not hmac.compare_digest(token.encode("utf-8"), self._token.encode("utf-8")):
+                respond(error=RpcError(UNAUTHORIZED, "Authenticate first with the 'auth' method and the server's token."))
+                connection.reject()
+                return
+            connection.authenticated = True
+
+        handler = self.methods.get(request["method"])
+        if handler is None:
+            respond(error=RpcError(METHOD_NOT_FOUND, f"Unknown method {request['method']!r}."))
+            return
+        try:
+            inspect.signature(handler).bind(respond, **params)
+        except TypeError as e:
+            respond(error=RpcError(INVALID_PARAMS, str(e)))
+            return
+        try:
+            handler(respond, **params)
+        except RpcError as e:
+            respond(error=e)
+        except Exception as e:
+            respond(error=RpcError(APPLICATION_ERROR, f"{type(e).__name__}: {e}"))
+
+    # --- Tab bookkeeping ---
+
+    def register_view(self, view: QWebEngineView) -> int:
+        """Assigns a tab id to a view and starts recording its load timings."""
+        existing = view.property(TAB_ID_PROPERTY)
+        if existing is not None:
+            return existing
+        tab_id = self._next_tab_id
+        self._next_tab_id += 1
+        view.setProperty(TAB_ID_PROPERTY, tab_id)
+        self.views[tab_id] = view
+        view.loadStarted.connect(lambda tid=tab_id: self.on_load_started(tid))
+        view.loadFinished.connect(lambda ok, tid=tab_id: self.on_load_finished(tid, ok))
+        view.destroyed.connect(lambda _=None, tid=tab_id: self.forget_view(tid))
+        return tab_id
+
+    def forget_view(self, tab_id: int):
+        self.views.pop(tab_id, None)
+        self.timings.pop(tab_id, None)
+        for respond, timer in self.pending_loads.pop(tab_id, []):
+            timer.stop()
+            timer.deleteLater()
+            respond(error=RpcError(APPLICATION_ERROR, "Tab was closed."))
+
+    def resolve_view(self, tab: int | None) -> tuple[int, QWebEngineView]:
+        if tab is None:
+            view = self.main_window.current_browser_view()
+            if view is None:
+                raise RpcError(APPLICATION_ERROR, "No active tab.")
+            return self.register_view(view), view
+        view = self.views.get(tab)
+        if view is None or self.main_window.tab_widget.indexOf(view) == -1:
+            raise RpcError(INVALID_PARAMS, f"No tab with id {tab}.")
+        return tab, view
+
+    def on_load_started(self, tab_id: int):
+        self.timings[tab_id] = {"started_at": time.time(), "_started": time.perf_counter(),
+                                "finished_at": None, "duration_ms": None, "ok": None}
+
+    def on_load_finished(self, tab_id: int, ok: bool):
+        timing = self.timings.setdefault(tab_id, {"started_at": None, "_started": None})
+        timing["finished_at"] = time.time()
+        timing["ok"] = ok
+        if timing.get("_started") is not None:
+            timing["duration_ms"] = round((time.perf_counter() - timing["_started"]) * 1000, 1)
+        for respond, timer in self.pending_loads.pop(tab_id, []):
+            timer.stop()
+            timer.deleteLater()
+            respond(self.load_result(tab_id))
+
+    def load_result(self, tab_id: int) -> dict:
+        view = self.views.get(tab_id)
+        timing = self.timings.get(tab_id, {})
+        return {
+            "tab": tab_id,
+            "url": view.url().toString() if view else None,
+            "ok": timing.get("ok"),
+            "duration_ms": timing.get("duration_ms"),
+        }
+
+    def describe_view(self, tab_id: int, view: QWebEngineView) -> dict:
+        return {
+            "tab": tab_id,
+            "url": view.url().toString(),
+            "title": view.title(),
+            "loading": view.isLoading(),
+            "current": view is self.main_window.current_browser_view(),
+        }
+
+    # --- RPC methods ---
+
+    def rpc_auth(self, respond, token: str | None = None):
+        respond({"authenticated": True}) # Checked in handle_line before dispatch
+
+    def rpc_ping(self, respond):
+        respond("pong")
+
+    def rpc_tabs_list(self, respond):
+        tabs = []
+        for index in range(self.main_window.tab_widget.count()):
+            view = self.main_window.tab_widget.widget(index)
+            if isinstance(view, QWebEngineView):
+                tabs.append(self.describe_view(self.register_view(view), view))
+        respond(tabs)
+
+    def rpc_tabs_open(self, respond, url: str | None = None, activate: bool = True):
+        view = self.main_window.add_new_tab(QUrl(url) if url else None, make_current=activate)
+        tab_id = self.register_view(view)
+        respond({"tab": tab_id})
+
+    def rpc_tabs_close(self, respond, tab: int | None = None):
+        tab_id, view = self.resolve_view(tab)
+        self.main_window.close_tab(self.main_window.tab_widget.indexOf(view))
+        respond({"tab": tab_id, "closed": True})
+
+    def rpc_tabs_activate(self, respond, tab: int):
+        tab_id, view = self.resolve_view(tab)
+        self.main_window.tab_widget.setCurrentWidget(view)
+        self.main_window.activateWindow()
+        respond({"tab": tab_id})
+
+    def rpc_navigate(self, respond, url: str, tab: int | None = None, wait: bool = False, timeout: float = 30.0):
+        tab_id, view = self.resolve_view(tab)
+        view.setUrl(QUrl.fromUserInput(url))
+        if wait:
+            self.wait_for_load(respond, tab_id, timeout, require_new_load=True)
+        else:
+            respond({"tab": tab_id})
+
+    def rpc_wait_for_load(self, respond, tab: int | None = None, timeout: float = 30.0):
+        tab_id, _ = self.resolve_view(tab)
+        self.wait_for_load(respond, tab_id, timeout)
+
+    def wait_for_load(self, respond, tab_id: int, timeout: float, require_new_load: bool = False):
+        view = self.views[tab_id]
+        if not require_new_load and not view.isLoading() and tab_id in self.timings:
+            respond(self.load_result(tab_id))
+            return
+
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        entry = (respond, timer)
+
+        def on_timeout():
+            waiting = self.pending_loads.get(tab_id, [])
+            if entry in waiting:
+                waiting.remove(entry)
+            respond(error=RpcError(TIMEOUT_ERROR, f"Tab {tab_id} did not finish loading within {timeout}s."))
+            timer.deleteLater()
+
+        timer.timeout.connect(on_timeout)
+        timer.start(int(timeout * 1000))
+        self.pending_loads.setdefault(tab_id, []).append(entry)
+
+    def rpc_run_javascript(self, respond, script: str, tab: int | None = None):
+        _, view = self.resolve_view(tab)
+        view.page().runJavaScript(script, lambda result: respond(result))
+
+    def rpc_timings(self, respond, tab: int | None = None):
+        tab_id, view = self.resolve_view(tab)
+        result = self.load_result(tab_id)
+        result["started_at"] = self.timings.get(tab_id, {}).get("started_at")
+        result["finished_at"] = self.timings.get(tab_id, {}).get("finished_at")
+
+        def on_navigation_timing(entry):
+            result["navigation"] = entry
+            respond(result)
+
+        # Navigation Timing from the page itself complements the Qt-side measurement
+        view.page().runJavaScript(
+            "(function(){var e=performance.getEntriesByType('navigation')[0];return e?e.toJSON():null;})()",
+            on_navigation_timing)
+
+    def rpc_screenshot(self, respond, tab: int | None = None):
+        tab_id, view = self.resolve_view(tab)
+        pixmap = view.grab()
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        pixmap.save(buffer, "PNG")
+        buffer.close()
+        respond({"tab": tab_id, "width": pixmap.width(), "height": pixmap.height(),
+                 "png": base64.b64encode(bytes(data)).decode("ascii")})
+
+    def rpc_user_script_stats(self, respond):
+        respond(self.main_window.user_scripts.stats())
+
+    def rpc_user_script_reload(self, respond):
+        self.main_window.user_scripts.reload()
+        respond(self.main_window.user_scripts.stats())
+
+    def rpc_predictor_stats(self, respond):
+        respond(self.main_window.predictor.stats())
+
+    def rpc_watchdog_stats(self, respond):
+        from loop_watchdog import shared_watchdog
+        respond(shared_watchdog().stats())
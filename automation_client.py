@@ -0,0 +1,238 @@
+# automation_client.py
+"""
+Client for the browser's local JSON-RPC automation server (see automation.py).
+
+This module only depends on the standard library so soak-test and regression
+scripts can drive the browser without importing PyQt6. Run it directly for a
+quick throughput benchmark:
+
+    python automation_client.py bench --count 5000 --in-flight 200
+
+TCP connections must authenticate first: the server writes a random token to a
+file only the current user can read (see token_path()), and the client sends it
+in an "auth" request. Unix sockets are already limited to the current user.
+"""
+import argparse
+import base64
+import itertools
+import json
+import os
+import socket
+import tempfile
+import time
+
+DEFAULT_SOCKET_NAME = "encrypt-browser-automation"
+DEFAULT_TCP_PORT = 9333
+DEFAULT_ADDRESS = f"unix:{DEFAULT_SOCKET_NAME}" if os.name == "posix" else f"tcp:{DEFAULT_TCP_PORT}"
+TOKEN_ENV = "ENCRYPT_BROWSER_AUTOMATION_TOKEN"
+
+
+class AutomationError(Exception):
+    """Raised when the server answers a request with a JSON-RPC error object."""
+    def __init__(self, code: int, message: str, data=None):
+        super().__init__(f"[{code}] {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+def parse_address(address: str) -> tuple[str, str | tuple[str, int]]:
+    """
+    Parses an automation address into ("unix", path) or ("tcp", (host, port)).
+
+    Accepted forms: "unix:NAME" (resolved inside the temp directory), "unix:/abs/path",
+    "tcp:PORT", "tcp:HOST:PORT" or a bare port number. TCP hosts are limited to
+    loopback addresses; the server never listens on a public interface.
+    """
+    address = (address or DEFAULT_ADDRESS).strip()
+    if address.isdigit():
+        address = f"tcp:{address}"
+    kind, _, rest = address.partition(":")
+    if kind == "unix":
+        path = rest or DEFAULT_SOCKET_NAME
+        if not os.path.isabs(path):
+            path = os.path.join(tempfile.gettempdir(), path)
+        return "unix", path
+    if kind == "tcp":
+        host, _, port = rest.rpartition(":")
+        host = host or "127.0.0.1"
+        if host not in ("127.0.0.1", "localhost", "::1"):
+            raise ValueError(f"Automation server only binds to localhost, not {host!r}")
+        return "tcp", (host, int(port or DEFAULT_TCP_PORT))
+    raise ValueError(f"Unknown automation address {address!r} (expected unix:... or tcp:...)")
+
+
+def token_path(port: int) -> str:
+    """File holding the auth token of the TCP server on `port`, in the user's home directory."""
+    return os.path.join(os.path.expanduser("~"), f".encrypt-browser-automation-{port}.token")
+
+
+def read_token(port: int) -> str:
+    """The token from $ENCRYPT_BROWSER_AUTOMATION_TOKEN, or else from token_path(port)."""
+    if token := os.environ.get(TOKEN_ENV):
+        return token
+    try:
+        with open(token_path(port), encoding="ascii") as f:
+            return f.read().strip()
+    except OSError as e:
+        raise ConnectionError(f"No automation token for port {port}: {e}") from e
+
+
+class AutomationClient:
+    """
+    Blocking JSON-RPC client. Requests are newline-delimited JSON objects, so
+    several of them can be pipelined on one connection with call_many(). TCP
+    connections authenticate with `token`, or with read_token() if it is omitted.
+    """
+    def __init__(self, address: str = DEFAULT_ADDRESS, timeout: float = 60.0, token: str | None = None):
+        kind, target = parse_address(address)
+        if kind == "unix":
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(timeout)
+            self._sock.connect(target)
+        else:
+            self._sock = socket.create_connection(target, timeout=timeout) # Picks AF_INET6 for ::1
+        self._reader = self._sock.makefile("rb")
+        self._ids = itertools.count(1)
+        if kind == "tcp":
+            try:
+                self.call("auth", token=token or read_token(target[1]))
+            except BaseException:
+                self.close()
+                raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        try:
+            self._reader.close()
+        finally:
+            self._sock.close()
+
+    def _send(self, method: str, params: dict) -> int:
+        request_id = next(self._ids)
+        payload = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+        self._sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        return request_id
+
+    def _receive(self) -> dict:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Automation server closed the connection.")
+        return json.loads(line)
+
+    @staticmethod
+    def _unwrap(response: dict):
+        if "error" in response:
+            error = response["error"]
+            raise AutomationError(error.get("code", -32000), error.get("message", ""), error.get("data"))
+        return response.get("result")
+
+    def call(self, method: str, **params):
+        """Sends one request and waits for its response."""
+        request_id = self._send(method, params)
+        while True:
+            response = self._receive()
+            if response.get("id") == request_id:
+                return self._unwrap(response)
+
+    def call_many(self, calls: list[tuple[str, dict]], in_flight: int = 100) -> list:
+        """
+        Pipelines calls with at most `in_flight` outstanding requests and returns
+        the results in the order of `calls`. Failed calls yield an AutomationError
+        instance in their slot instead of raising.
+        """
+        results = [None] * len(calls)
+        slot_for_id = {}
+        next_call = 0
+        while next_call < len(calls) or slot_for_id:
+            while next_call < len(calls) and len(slot_for_id) < in_flight:
+                method, params = calls[next_call]
+                slot_for_id[self._send(method, params or {})] = next_call
+                next_call += 1
+            response = self._receive()
+            slot = slot_for_id.pop(response.get("id"), None)
+            if slot is None:
+                continue
+            try:
+                results[slot] = self._unwrap(response)
+            except AutomationError as e:
+                results[slot] = e
+        return results
+
+    # Convenience wrappers around the server's methods
+
+    def tabs(self) -> list[dict]:
+        return self.call("tabs.list")
+
+    def open_tab(self, url: str | None = None, activate: bool = True) -> int:
+        return self.call("tabs.open", url=url, activate=activate)["tab"]
+
+    def close_tab(self, tab: int):
+        return self.call("tabs.close", tab=tab)
+
+    def activate_tab(self, tab: int):
+        return self.call("tabs.activate", tab=tab)
+
+    def navigate(self, url: str, tab: int | None = None, wait: bool = False, timeout: float = 30.0):
+        return self.call("page.navigate", url=url, tab=tab, wait=wait, timeout=timeout)
+
+    def wait_for_load(self, tab: int | None = None, timeout: float = 30.0) -> dict:
+        return self.call("page.waitForLoad", tab=tab, timeout=timeout)
+
+    def run_javascript(self, script: str, tab: int | None = None):
+        return self.call("page.runJavaScript", script=script, tab=tab)
+
+    def timings(self, tab: int | None = None) -> dict:
+        return self.call("page.timings", tab=tab)
+
+    def screenshot(self, tab: int | None = None) -> bytes:
+        """Returns the PNG bytes of the tab's current viewport."""
+        return base64.b64decode(self.call("page.screenshot", tab=tab)["png"])
+
+
+def run_benchmark(client: AutomationClient, count: int, in_flight: int, method: str = "ping") -> dict:
+    """Measures pipelined commands per second for a cheap method."""
+    calls = [(method, {})] * count
+    started = time.perf_counter()
+    results = client.call_many(calls, in_flight=in_flight)
+    elapsed = time.perf_counter() - started
+    errors = sum(1 for result in results if isinstance(result, AutomationError))
+    return {
+        "method": method,
+        "count": count,
+        "in_flight": in_flight,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "commands_per_second": round(count / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Encrypt Browser automation client")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS, help="unix:NAME, unix:/path or tcp:[HOST:]PORT")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    bench = subparsers.add_parser("bench", help="Measure pipelined command throughput")
+    bench.add_argument("--count", type=int, default=2000)
+    bench.add_argument("--in-flight", type=int, default=100)
+    bench.add_argument("--method", default="ping", help="Parameterless method to call (e.g. ping, tabs.list)")
+
+    call = subparsers.add_parser("call", help="Send a single request")
+    call.add_argument("method")
+    call.add_argument("params", nargs="?", default="{}", help="JSON object of parameters")
+
+    args = parser.parse_args(argv)
+    with AutomationClient(args.address) as client:
+        if args.command == "bench":
+            print(json.dumps(run_benchmark(client, args.count, args.in_flight, args.method), indent=2))
+        else:
+            print(json.dumps(client.call(args.method, **json.loads(args.params)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
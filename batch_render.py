@@ -0,0 +1,277 @@
+# batch_render.py
+"""
+Headless batch rendering of URL lists to PDF or PNG.
+
+Run through the application entry point so the same rendering environment is used:
+
+    python app.py render urls.txt --output-dir out --format pdf --pool-size 4
+
+URLs are streamed from the input file and rendered by a fixed pool of reused
+CustomWebEnginePage instances, so memory stays flat no matter how long the list is.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from collections import deque
+from typing import Iterable, Iterator
+
+from PyQt6.QtCore import QObject, QTimer, QUrl, QSize, Qt, pyqtSignal
+from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
+from PyQt6.QtWebEngineWidgets import QWebEngineView
+
+from web_engine_page import CustomWebEnginePage
+
+PAGE_RECYCLE_AFTER = 200 # Jobs rendered by one page before it is replaced, to cap renderer growth
+RENDER_CACHE_BYTES = 32 * 1024 * 1024
+
+
+def iter_urls(source: str) -> Iterator[str]:
+    """Yields URLs from a file (or stdin for "-"), skipping blank lines and # comments."""
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for line in stream:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def count_urls(source: str) -> int | None:
+    """Counts URLs without keeping them in memory; stdin cannot be counted up front."""
+    if source == "-":
+        return None
+    return sum(1 for _ in iter_urls(source))
+
+
+def output_name(index: int, url: str, extension: str) -> str:
+    host = QUrl.fromUserInput(url).host() or "page"
+    safe_host = re.sub(r"[^A-Za-z0-9.-]+", "_", host)[:60]
+    return f"{index:06d}-{safe_host}.{extension}"
+
+
+class RenderJob:
+    """One URL to render, with the number of attempts made so far."""
+    __slots__ = ("index", "url", "path", "attempts", "started")
+
+    def __init__(self, index: int, url: str, path: str):
+        self.index = index
+        self.url = url
+        self.path = path
+        self.attempts = 0
+        self.started = 0.0
+
+
+class _RenderSlot(QObject):
+    """
+    A reusable offscreen view/page pair. The view is never shown on screen but is
+    laid out at the viewport size so PNG captures have real content.
+    """
+    done = pyqtSignal(object, bool, str) # job, success, error message
+
+    def __init__(self, renderer: 'BatchRenderer'):
+        super().__init__(renderer)
+        self.renderer = renderer
+        self.job = None
+        self.jobs_rendered = 0
+        self.view = QWebEngineView()
+        self.view.setAttribute(Qt.WidgetAttribute.WA_DontShowOnScreen, True)
+        self.view.resize(renderer.viewport)
+        self.view.show()
+        self.page = None
+        self.timeout_timer = QTimer(self)
+        self.timeout_timer.setSingleShot(True)
+        self.timeout_timer.timeout.connect(self.on_timeout)
+        self.new_page()
+
+    def new_page(self):
+        """Replaces the slot's page, dropping any signals still in flight for the old one."""
+        if self.page is not None:
+            self.page.loadFinished.disconnect()
+            self.page.pdfPrintingFinished.disconnect()
+            self.view.setPage(None)
+            self.page.deleteLater()
+        self.page = CustomWebEnginePage(self.renderer.profile, None, self.view)
+        self.page.loadFinished.connect(self.on_load_finished)
+        self.page.pdfPrintingFinished.connect(self.on_pdf_finished)
+        self.view.setPage(self.page)
+        self.jobs_rendered = 0
+
+    def render(self, job: RenderJob):
+        self.job = job
+        job.attempts += 1
+        job.started = time.perf_counter()
+        self.timeout_timer.start(int(self.renderer.timeout * 1000))
+        self.page.setUrl(QUrl.fromUserInput(job.url))
+
+    def on_load_finished(self, ok: bool):
+        if self.job is None or self.page.isLoading():
+            return
+        if not ok:
+            self.finish(False, "load failed")
+        elif self.renderer.format == "pdf":
+            self.page.printToPdf(self.job.path)
+        else:
+            QTimer.singleShot(self.renderer.settle_ms,
+                              lambda job=self.job, attempt=self.job.attempts: self.capture_png(job, attempt))
+
+    def capture_png(self, job: RenderJob, attempt: int):
+        # The capture was scheduled for that attempt; a timeout may have moved the slot on since
+        if self.job is not job or job.attempts != attempt:
+            return
+        if self.view.grab().save(self.job.path, "PNG"):
+            self.finish(True, "")
+        else:
+            self.finish(False, "could not write PNG")
+
+    def on_pdf_finished(self, path: str, ok: bool):
+        if self.job is not None and path == self.job.path:
+            self.finish(ok, "" if ok else "printToPdf failed")
+
+    def on_timeout(self):
+        if self.job is None:
+            return
+        # A stopped load can still deliver late signals; a fresh page ignores them
+        self.page.triggerAction(QWebEnginePage.WebAction.Stop)
+        self.new_page()
+        self.finish(False, f"timed out after {self.renderer.timeout:g}s")
+
+    def finish(self, success: bool, error: str):
+        self.timeout_timer.stop()
+        job, self.job = self.job, None
+        self.jobs_rendered += 1
+        self.page.history().clear()
+        if self.jobs_rendered >= PAGE_RECYCLE_AFTER:
+            self.new_page()
+        self.done.emit(job, success, error)
+
+    def close(self):
+        self.timeout_timer.stop()
+        self.view.setPage(None)
+        if self.page is not None:
+            self.page.deleteLater()
+        self.view.deleteLater()
+
+
+class BatchRenderer(QObject):
+    """Renders a stream of URLs with bounded concurrency, per-URL timeouts and retries."""
+    finished = pyqtSignal(int) # exit code: 0 if every URL rendered
+
+    def __init__(self, urls: Iterable[str], output_dir: str, format: str = "pdf", pool_size: int = 4,
+                 timeout: float = 30.0, retries: int = 1, viewport: QSize = QSize(1280, 800),
+                 settle_ms: int = 250, total: int | None = None, parent=None):
+        super().__init__(parent)
+        self.urls = iter(urls)
+        self.output_dir = output_dir
+        self.format = format
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.viewport = viewport
+        self.settle_ms = settle_ms
+        self.total = total
+
+        # Off-the-record profile: batch runs never touch the user's cookies or disk cache
+        self.profile = QWebEngineProfile(self)
+        self.profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.MemoryHttpCache)
+        self.profile.setHttpCacheMaximumSize(RENDER_CACHE_BYTES)
+
+        self.retry_queue = deque()
+        self.slots = []
+        self.idle_slots = []
+        self.next_index = 1
+        self.rendered = 0
+        self.failed = 0
+        self.retried = 0
+        self.render_ms_total = 0.0
+        self.started = 0.0
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.started = time.perf_counter()
+        for _ in range(self.pool_size):
+            slot = _RenderSlot(self)
+            slot.done.connect(lambda job, ok, error, s=slot: self.on_slot_done(s, job, ok, error))
+            self.slots.append(slot)
+            self.idle_slots.append(slot)
+        self.fill_slots()
+
+    def next_job(self) -> RenderJob | None:
+        if self.retry_queue:
+            return self.retry_queue.popleft()
+        url = next(self.urls, None)
+        if url is None:
+            return None
+        index = self.next_index
+        self.next_index += 1
+        path = os.path.join(self.output_dir, output_name(index, url, self.format))
+        return RenderJob(index, url, path)
+
+    def fill_slots(self):
+        while self.idle_slots:
+            job = self.next_job()
+            if job is None:
+                break
+            self.idle_slots.pop().render(job)
+        if len(self.idle_slots) == len(self.slots):
+            self.finish()
+
+    def on_slot_done(self, slot: _RenderSlot, job: RenderJob, ok: bool, error: str):
+        elapsed_ms = (time.perf_counter() - job.started) * 1000
+        if ok:
+            self.rendered += 1
+            self.render_ms_total += elapsed_ms
+            self.report(job, "OK", f"{elapsed_ms:7.0f}ms -> {job.path}")
+        elif job.attempts <= self.retries:
+            self.retried += 1
+            self.retry_queue.append(job)
+            self.report(job, "RETRY", error)
+        else:
+            self.failed += 1
+            self.report(job, "FAIL", error)
+        self.idle_slots.append(slot)
+        # Hand out the next job from the event loop rather than from inside the slot's signal
+        QTimer.singleShot(0, self.fill_slots)
+
+    def report(self, job: RenderJob, status: str, detail: str):
+        done = self.rendered + self.failed
+        total = self.total if self.total is not None else "?"
+        print(f"[{done}/{total}] {status:<5} {job.url} {detail}", flush=True)
+
+    def finish(self):
+        if not self.slots:
+            return
+        for slot in self.slots:
+            slot.close()
+        self.slots.clear()
+        self.idle_slots.clear()
+
+        elapsed = time.perf_counter() - self.started
+        processed = self.rendered + self.failed
+        print("\nBatch render summary")
+        print(f"  Rendered:  {self.rendered}")
+        print(f"  Failed:    {self.failed}")
+        print(f"  Retries:   {self.retried}")
+        print(f"  Elapsed:   {elapsed:.1f}s")
+        if elapsed > 0:
+            print(f"  Throughput: {processed / elapsed:.2f} pages/s")
+        if self.rendered:
+            print(f"  Mean render time: {self.render_ms_total / self.rendered:.0f}ms")
+        self.finished.emit(0 if self.failed == 0 else 1)
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="app.py render", description="Render a list of URLs to PDF or PNG without showing the browser window.")
+    parser.add_argument("urls", help="File with one URL per line, or - for stdin")
+    parser.add_argument("-o", "--output-dir", default="rendered", help="Directory for the rendered files")
+    parser.add_argument("-f", "--format", choices=("pdf", "png"), default="pdf")
+    parser.add_argument("-p", "--pool-size", type=int, default=4, help="Number of pages rendering concurrently")
+    parser.add_argument("-t", "--timeout", type=float, default=30.0, help="Seconds allowed per URL attempt")
+    parser.add_argument("-r", "--retries", type=int, default=1, help="Extra attempts for a failed URL")
+    parser.add_argument("--width", type=int, default=1280, help="Viewport width for PNG output")
+    parser.add_argument("--height", type=int, default=800, help="Viewport height for PNG output")
+    parser.add_argument("--settle-ms", type=int, default=250, help="Delay after load before a PNG capture")
+    return parser
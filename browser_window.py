@@ -1,43 +1,76 @@
 # browser_window.py
 from PyQt6.QtWidgets import (
     QMainWindow, QLineEdit, QToolBar, QStatusBar,
-    QWidget, QSizePolicy, QTabWidget, QTabBar, QMessageBox
+    QWidget, QSizePolicy, QTabWidget, QTabBar, QMessageBox, QLabel, QPushButton
 )
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage, QWebEngineSettings
-from PyQt6.QtCore import QUrl, QSize, Qt
-from PyQt6.QtGui import QAction
+from PyQt6.QtCore import QUrl, QSize, Qt, pyqtSignal
+from PyQt6.QtGui import QAction, QIcon
 
 # Import from our other modules
-from constants import STYLESHEET
 from ui_components import (
     create_icon_from_svg, BACK_ICON_SVG, FORWARD_ICON_SVG, RELOAD_ICON_SVG,
     HOME_ICON_SVG, STOP_ICON_SVG, SETTINGS_ICON_SVG, NEW_TAB_ICON_SVG,
-    SHIELD_ICON_SVG, INSPECT_ICON_SVG 
+    SHIELD_ICON_SVG, INSPECT_ICON_SVG, SEARCH_ICON_SVG, PRIVATE_WINDOW_ICON_SVG, DATA_SAVER_ICON_SVG
     # CLOSE_TAB_ICON_SVG is not used here directly, tabs use default close buttons
 )
-from dialogs import SettingsDialog, SecurityDialog
+from dialogs import SettingsDialog, SecurityDialog, PageSearchDialog
 from web_engine_page import CustomWebEnginePage
+from page_index import PageSearcher, PageTextCollector, shared_index_worker
+from user_scripts import shared_user_script_manager
+from favicon_store import shared_favicon_store
+from profiles import default_profile, acquire_private_profile, release_private_profile
+from data_saver import shared_data_saver, format_bytes
+from predictor import shared_predictor, AddressBarPredictor
+from themes import shared_theme_manager, MODES as THEME_MODES
+
+# Windows opened from another window (e.g. private windows) are kept alive here until closed
+_secondary_windows = set()
+
+REPLACED_PAGES_KEPT = 2 # Pages swapped out for a prerendered page that Back can still return to
 
 
 class WebBrowserWindow(QMainWindow):
     """Main window for the tabbed web browser."""
-    def __init__(self):
+
+    # Emitted for every new tab view so optional subsystems (e.g. automation) can hook it
+    browser_view_created = pyqtSignal(QWebEngineView)
+
+    def __init__(self, private: bool = False, home_url: QUrl | None = None):
         super().__init__()
-        self.setWindowTitle("Web Browser") 
+        self.private = private
+        self.base_title = "Web Browser (Private)" if private else "Web Browser"
+        self.setWindowTitle(self.base_title) 
         self.setGeometry(100, 100, 1024, 768) # Default size
-        self.setStyleSheet(STYLESHEET) 
 
-        self.default_url = QUrl("https://www.google.com") 
+        self.default_url = home_url or QUrl("https://www.google.com") 
+
+        # Private windows share an off-the-record profile that keeps everything in RAM
+        self.profile = acquire_private_profile() if private else default_profile()
 
-        self.profile = QWebEngineProfile("SecureUserProfile", self) 
+        # Visited page text is indexed in the background; searches use their own read connection
+        self.index_worker = shared_index_worker()
+        if not private:
+            self.page_text_collector = PageTextCollector(self, self.index_worker)
+            self.browser_view_created.connect(self.page_text_collector.watch)
+        self.page_searcher = None
 
+        self.user_scripts = shared_user_script_manager()
+        self.favicons = shared_favicon_store()
+        self.data_saver = shared_data_saver()
+        self.data_saver.policy.changed.connect(self.reapply_data_saver)
 
         self.address_bar = QLineEdit() 
         self.address_bar.setObjectName("AddressBar") 
         self.address_bar.setStatusTip("Enter web address and press Enter")
         self.address_bar.returnPressed.connect(self.load_url_from_address_bar)
 
+        # Opt-in address bar prediction; private windows neither learn nor prerender
+        self.predictor = shared_predictor()
+        self.address_predictor = None if private else AddressBarPredictor(self, self.predictor)
+
+        self.toolbar_icon_svgs = {} # QAction -> SVG source, re-rendered when the theme changes
         self.setup_toolbars() 
 
         self.tab_widget = QTabWidget()
@@ -51,20 +84,30 @@ class WebBrowserWindow(QMainWindow):
         self.add_new_tab(self.default_url) 
 
         self.setStatusBar(QStatusBar(self))
+        self.load_images_button = QPushButton("Load images")
+        self.load_images_button.setFlat(True)
+        self.load_images_button.setToolTip("Load this page's images once; data saving stays on elsewhere")
+        self.load_images_button.clicked.connect(self.load_images_for_current_page)
+        self.statusBar().addPermanentWidget(self.load_images_button)
+        self.data_saver_label = QLabel("")
+        self.statusBar().addPermanentWidget(self.data_saver_label)
+
+        # Colors come from the application palette; only these widgets carry (small, precompiled) QSS
+        self.theme = shared_theme_manager()
+        self.theme.style(self.top_toolbar, "top_toolbar")
+        self.theme.style(self.tab_widget.tabBar(), "tab_bar")
+        self.theme.style(self.bottom_toolbar, "bottom_toolbar")
+        self.theme.style(self.statusBar(), "status_bar")
+        self.theme.theme_changed.connect(self.refresh_toolbar_icons)
         self.current_tab_changed(0)
 
-    def create_browser_view(self) -> QWebEngineView:
-        """Creates a new QWebEngineView with a CustomWebEnginePage and default settings."""
+    def create_browser_view(self, profile: QWebEngineProfile | None = None) -> QWebEngineView:
+        """
+        Creates a new QWebEngineView with a CustomWebEnginePage and default settings.
+        The page uses `profile` if given, otherwise the window's profile.
+        """
         browser_view = QWebEngineView()
-        page_settings = browser_view.settings() 
-
-        page_settings.setAttribute(QWebEngineSettings.WebAttribute.DnsPrefetchEnabled, False)
-        page_settings.setAttribute(QWebEngineSettings.WebAttribute.HyperlinkAuditingEnabled, False)
-        page_settings.setAttribute(QWebEngineSettings.WebAttribute.ScreenCaptureEnabled, False) 
-        page_settings.setAttribute(QWebEngineSettings.WebAttribute.XSSAuditingEnabled, False) 
-        page_settings.setAttribute(QWebEngineSettings.WebAttribute.WebGLEnabled, False) 
-
-        custom_page = CustomWebEnginePage(self.profile, self, browser_view) 
+        custom_page = self.create_page(profile, browser_view)
         browser_view.setPage(custom_page)
 
         browser_view.urlChanged.connect(lambda qurl, bv=browser_view: self.update_url_in_address_bar(qurl, bv))
@@ -72,8 +115,52 @@ class WebBrowserWindow(QMainWindow):
         browser_view.loadStarted.connect(lambda bv=browser_view: self.on_load_started(bv))
         browser_view.loadProgress.connect(lambda progress, bv=browser_view: self.on_load_progress(progress, bv))
         browser_view.titleChanged.connect(lambda title, bv=browser_view: self.update_tab_title(title, bv))
+        browser_view.iconChanged.connect(lambda icon, bv=browser_view: self.update_tab_icon(icon, bv))
+        self.watch_data_saver(custom_page, browser_view)
+        self.browser_view_created.emit(browser_view)
         return browser_view
 
+    def create_page(self, profile: QWebEngineProfile | None = None,
+                    parent_view: QWebEngineView | None = None) -> CustomWebEnginePage:
+        """Creates a CustomWebEnginePage with the browser's default settings (also used for hidden prerender pages)."""
+        custom_page = CustomWebEnginePage(profile or self.profile, self, parent_view) 
+        page_settings = custom_page.settings() 
+
+        page_settings.setAttribute(QWebEngineSettings.WebAttribute.DnsPrefetchEnabled, False)
+        page_settings.setAttribute(QWebEngineSettings.WebAttribute.HyperlinkAuditingEnabled, False)
+        page_settings.setAttribute(QWebEngineSettings.WebAttribute.ScreenCaptureEnabled, False) 
+        page_settings.setAttribute(QWebEngineSettings.WebAttribute.XSSAuditingEnabled, False) 
+        page_settings.setAttribute(QWebEngineSettings.WebAttribute.WebGLEnabled, False) 
+        return custom_page
+
+    def watch_data_saver(self, page: QWebEnginePage, browser_view: QWebEngineView):
+        if getattr(page, 'data_saver', None) is not None:
+            page.data_saver.state_changed.connect(lambda bv=browser_view: self.update_data_saver_status(bv))
+
+    def swap_in_page(self, browser_view: QWebEngineView, page: QWebEnginePage, load_ok: bool | None):
+        """
+        Shows a prerendered page in a tab. The page it replaces is discarded (its
+        memory freed, its history kept) so Back can still return to it.
+        """
+        old_page = browser_view.page()
+        page.setParent(browser_view)
+        browser_view.setPage(page)
+        self.watch_data_saver(page, browser_view)
+        if old_page is not None:
+            if hasattr(old_page, 'setLifecycleState'):
+                old_page.setLifecycleState(QWebEnginePage.LifecycleState.Discarded)
+            page.replaced_page = old_page
+            older, kept = page, 0
+            while getattr(older, 'replaced_page', None) is not None and kept < REPLACED_PAGES_KEPT:
+                older, kept = older.replaced_page, kept + 1
+            dropped, older.replaced_page = getattr(older, 'replaced_page', None), None
+            while dropped is not None:
+                dropped.deleteLater()
+                dropped = getattr(dropped, 'replaced_page', None)
+        self.current_tab_changed(self.tab_widget.currentIndex())
+        if load_ok is not None:
+            browser_view.loadFinished.emit(load_ok) # Replays the finished load for listeners hooked to the view
+
     def add_new_tab(self, url: QUrl = None, make_current: bool = True) -> QWebEngineView:
         """Adds a new tab with a web browser view."""
         if url is None:
@@ -84,7 +171,9 @@ class WebBrowserWindow(QMainWindow):
         idx = self.tab_widget.addTab(browser_view, "New Tab") 
         self.tab_widget.setTabToolTip(idx, "Loading...") 
         
-        browser_view.setUrl(url) L
+        if cached_icon := self.favicons.icon_for_url(url):
+            self.tab_widget.setTabIcon(idx, cached_icon)
+        browser_view.setUrl(url)
 
         if make_current:
             self.tab_widget.setCurrentIndex(idx)
@@ -106,6 +195,7 @@ class WebBrowserWindow(QMainWindow):
                 browser_view_to_close.loadStarted.disconnect()
                 browser_view_to_close.loadProgress.disconnect()
                 browser_view_to_close.titleChanged.disconnect()
+                browser_view_to_close.iconChanged.disconnect()
             except TypeError: 
                 pass
             browser_view_to_close.stop() 
@@ -118,12 +208,38 @@ class WebBrowserWindow(QMainWindow):
 
             self.close() 
 
+    def open_private_window(self) -> 'WebBrowserWindow':
+        """Opens a new private window; it deletes itself (and its tabs) when closed."""
+        window = WebBrowserWindow(private=True)
+        window.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose, True)
+        _secondary_windows.add(window)
+        window.show()
+        return window
+
+    def closeEvent(self, event):
+        """Tears down a private window's pages and, with the last one, the private profile."""
+        if self.private and self.profile is not None:
+            for index in range(self.tab_widget.count() - 1, -1, -1):
+                view = self.tab_widget.widget(index)
+                if isinstance(view, QWebEngineView):
+                    view.stop()
+                    page = view.page()
+                    view.setPage(None)
+                    if page is not None:
+                        page.deleteLater() # Queued before the profile's own deleteLater
+            release_private_profile()
+            self.profile = None
+        self.close_page_searcher()
+        _secondary_windows.discard(self)
+        super().closeEvent(event)
+
     def current_tab_changed(self, index: int):
         """Updates UI elements when the current tab changes."""
         browser_view = self.current_browser_view()
         if browser_view:
             self.update_url_in_address_bar(browser_view.url(), browser_view)
             self.update_tab_title(browser_view.title(), browser_view) 
+            self.update_data_saver_status(browser_view)
 
             if browser_view.isLoading():
                 self.on_load_started(browser_view)
@@ -132,7 +248,7 @@ class WebBrowserWindow(QMainWindow):
         else:
 
             self.address_bar.setText("")
-            self.setWindowTitle("Web Browser")
+            self.setWindowTitle(self.base_title)
             self.statusBar().clearMessage()
         self.update_navigation_buttons_state()
 
@@ -146,6 +262,16 @@ class WebBrowserWindow(QMainWindow):
                 return current_widget
         return None
 
+    def set_toolbar_icon(self, action: QAction, svg: str):
+        """Gives `action` the SVG icon drawn in the theme's text color, redrawn on theme changes."""
+        self.toolbar_icon_svgs[action] = svg
+        action.setIcon(create_icon_from_svg(svg, color=shared_theme_manager().color("window_text").name()))
+
+    def refresh_toolbar_icons(self, _theme_name: str | None = None):
+        color = shared_theme_manager().color("window_text").name()
+        for action, svg in self.toolbar_icon_svgs.items():
+            action.setIcon(create_icon_from_svg(svg, color=color))
+
     def setup_toolbars(self): 
         """Sets up the top navigation toolbar and the bottom address bar toolbar."""
    
@@ -157,17 +283,19 @@ class WebBrowserWindow(QMainWindow):
 
 
         actions_config = [
-            (BACK_ICON_SVG, "Back", lambda: self.current_browser_view().back() if self.current_browser_view() else None, "back_button", "Go to previous page"),
+            (BACK_ICON_SVG, "Back", self.navigate_back, "back_button", "Go to previous page"),
             (FORWARD_ICON_SVG, "Forward", lambda: self.current_browser_view().forward() if self.current_browser_view() else None, "forward_button", "Go to next page"),
             (RELOAD_ICON_SVG, "Reload", lambda: self.current_browser_view().reload() if self.current_browser_view() else None, "reload_button", "Reload current page"),
             (STOP_ICON_SVG, "Stop", lambda: self.current_browser_view().stop() if self.current_browser_view() else None, "stop_button", "Stop loading current page", True), 
             (HOME_ICON_SVG, "Home", self.navigate_home, "home_button", f"Go to home page ({self.default_url.toString()})"),
             (NEW_TAB_ICON_SVG, "New Tab", lambda: self.add_new_tab(make_current=True), "new_tab_button", "Open a new tab"),
+            (PRIVATE_WINDOW_ICON_SVG, "New Private Window", self.open_private_window, "private_window_button", "Open a window that keeps no history, cookies or cache on disk"),
             (INSPECT_ICON_SVG, "Inspect Element", self.open_inspector, "inspect_button", "Open Developer Tools")
         ]
 
         for icon_svg, text, callback, attr_name, tooltip, *disabled_state in actions_config:
-            action = QAction(create_icon_from_svg(icon_svg), text, self)
+            action = QAction(text, self)
+            self.set_toolbar_icon(action, icon_svg)
             action.setStatusTip(tooltip)
             action.triggered.connect(callback)
             setattr(self, attr_name, action) 
@@ -181,13 +309,31 @@ class WebBrowserWindow(QMainWindow):
         self.top_toolbar.addWidget(top_spacer) 
 
         
-        self.shield_button = QAction(create_icon_from_svg(SHIELD_ICON_SVG), "Security & Privacy", self)
+        self.data_saver_button = QAction("Data Saver", self)
+        self.set_toolbar_icon(self.data_saver_button, DATA_SAVER_ICON_SVG)
+        self.data_saver_button.setCheckable(True)
+        self.data_saver_button.setChecked(self.data_saver.policy.enabled)
+        self.data_saver_button.setStatusTip("Defer images, media and web fonts on all sites (per-site choices in Security & Privacy)")
+        self.data_saver_button.toggled.connect(self.data_saver.policy.set_enabled)
+        self.top_toolbar.addAction(self.data_saver_button)
+
+        self.search_pages_button = QAction("Search Pages", self)
+        self.set_toolbar_icon(self.search_pages_button, SEARCH_ICON_SVG)
+        self.search_pages_button.setStatusTip("Search the text of visited pages and open tabs")
+        self.search_pages_button.setShortcut("Ctrl+Shift+F")
+        self.search_pages_button.triggered.connect(self.open_page_search_dialog)
+        self.top_toolbar.addAction(self.search_pages_button)
+
+        
+        self.shield_button = QAction("Security & Privacy", self)
+        self.set_toolbar_icon(self.shield_button, SHIELD_ICON_SVG)
         self.shield_button.setStatusTip("Open Security & Privacy settings for current tab")
         self.shield_button.triggered.connect(self.open_security_dialog)
         self.top_toolbar.addAction(self.shield_button)
 
         
-        self.settings_button = QAction(create_icon_from_svg(SETTINGS_ICON_SVG), "Preferences", self)
+        self.settings_button = QAction("Preferences", self)
+        self.set_toolbar_icon(self.settings_button, SETTINGS_ICON_SVG)
         self.settings_button.setStatusTip("Open browser preferences")
         self.settings_button.triggered.connect(self.open_settings_dialog)
         self.top_toolbar.addAction(self.settings_button)
@@ -210,8 +356,11 @@ class WebBrowserWindow(QMainWindow):
 
     def open_settings_dialog(self):
         """Opens the general preferences dialog."""
-        dialog = SettingsDialog(self.default_url.toString(), self)
+        dialog = SettingsDialog(self.default_url.toString(), self, predictor=self.predictor,
+                                theme_mode=self.theme.mode, theme_modes=THEME_MODES)
         if dialog.exec(): 
+            self.predictor.configure(dialog.get_predict_enabled(), dialog.get_predict_origins())
+            self.theme.set_mode(dialog.get_theme_mode())
             new_home_page_str = dialog.get_home_page()
             if new_home_page_str:
                 
@@ -231,11 +380,92 @@ class WebBrowserWindow(QMainWindow):
         """Opens the security and privacy settings dialog for the current tab."""
         current_view = self.current_browser_view()
         if current_view:
-            dialog = SecurityDialog(current_view, self.profile, self)
+            dialog = SecurityDialog(current_view, self.profile, self, data_saver_policy=self.data_saver.policy,
+                                    persist_site_choices=not self.private)
             dialog.exec() 
         else: 
             self.statusBar().showMessage("No active tab for security settings.", 3000)
 
+    def update_data_saver_status(self, sender_view: QWebEngineView):
+        """Shows the current tab's estimated savings and the one-click image loader."""
+        if not hasattr(self, 'data_saver_label') or self.current_browser_view() != sender_view:
+            return
+        page_saver = getattr(sender_view.page(), 'data_saver', None)
+        if page_saver is None or not (page_saver.active or page_saver.bytes_saved):
+            self.data_saver_label.setText("")
+            self.load_images_button.setVisible(False)
+            return
+        self.data_saver_label.setText(f"Data saver: ~{format_bytes(page_saver.bytes_saved)} saved")
+        self.data_saver_label.setToolTip(f"{page_saver.blocked_requests} request(s) blocked and "
+                                         f"{page_saver.skipped_images} image(s) deferred in this tab (estimated sizes)")
+        self.load_images_button.setVisible(page_saver.images_blocked)
+
+    def load_images_for_current_page(self):
+        if current_view := self.current_browser_view():
+            self.data_saver.load_images(current_view.page())
+
+    def reapply_data_saver(self):
+        """Applies a changed data-saver policy to the pages already open in this window."""
+        if hasattr(self, 'data_saver_button'):
+            self.data_saver_button.blockSignals(True)
+            self.data_saver_button.setChecked(self.data_saver.policy.enabled)
+            self.data_saver_button.blockSignals(False)
+        for index in range(self.tab_widget.count()):
+            view = self.tab_widget.widget(index)
+            if isinstance(view, QWebEngineView) and view.page() is not None:
+                self.data_saver.apply(view.page(), view.url())
+
+    def open_page_search_dialog(self):
+        """Opens the full-text search over visited pages."""
+        if self.page_searcher is None:
+            self.page_searcher = PageSearcher(self.index_worker.path, self)
+        dialog = PageSearchDialog(self.page_searcher, self.open_url_in_tab, self,
+                                  icon_callback=lambda url: self.favicons.icon_for_url(QUrl(url)))
+        dialog.exec()
+
+    def open_url_in_tab(self, url: str):
+        """Switches to a tab already showing the URL, or opens it in a new tab."""
+        for index in range(self.tab_widget.count()):
+            view = self.tab_widget.widget(index)
+            if isinstance(view, QWebEngineView) and view.url().toString() == url:
+                self.tab_widget.setCurrentIndex(index)
+                return
+        self.add_new_tab(QUrl(url), make_current=True)
+
+    def clear_page_index(self) -> bool:
+        """Removes every page from the full-text index; False if that could not be confirmed."""
+        self.close_page_searcher()
+        return self.index_worker.clear()
+
+    def close_page_searcher(self):
+        if self.page_searcher is not None:
+            self.page_searcher.close()
+            self.page_searcher = None
+
+    def clear_favicons(self):
+        """Forgets every stored favicon and the pages they were seen on."""
+        self.favicons.clear()
+
+    def clear_predictions(self):
+        """Forgets the typed prefixes learned by the address bar predictor."""
+        self.predictor.clear()
+
+    def navigate_back(self):
+        """Goes back in the current tab, returning to a page replaced by a prerendered one at the start of its history."""
+        current_view = self.current_browser_view()
+        if current_view is None:
+            return
+        if current_view.history().canGoBack():
+            current_view.back()
+        elif (previous_page := getattr(current_view.page(), 'replaced_page', None)) is not None:
+            prerendered_page = current_view.page()
+            prerendered_page.replaced_page = None
+            if hasattr(previous_page, 'setLifecycleState'):
+                previous_page.setLifecycleState(QWebEnginePage.LifecycleState.Active)
+            current_view.setPage(previous_page)
+            prerendered_page.deleteLater()
+            self.current_tab_changed(self.tab_widget.currentIndex())
+
     def navigate_home(self):
         """Navigates the current tab to the default home page."""
         if current_view := self.current_browser_view(): 
@@ -247,7 +477,12 @@ class WebBrowserWindow(QMainWindow):
             url_text = self.address_bar.text()
             if not (url_text.startswith(("http://", "https://", "file://")) or "://" in url_text):
                 url_text = "https://" + url_text 
-            current_view.setUrl(QUrl(url_text))
+            url = QUrl(url_text)
+            prerendered = self.address_predictor.commit(url) if self.address_predictor else None
+            if prerendered is not None:
+                self.swap_in_page(current_view, *prerendered)
+            else:
+                current_view.setUrl(url)
 
     def update_url_in_address_bar(self, q_url: QUrl, sender_view: QWebEngineView):
         """Updates the address bar if the URL change is from the current tab."""
@@ -269,12 +504,25 @@ class WebBrowserWindow(QMainWindow):
         if self.current_browser_view() == sender_view:
             
             main_title = title if title else sender_view.url().host()
+            suffix = " (Private)" if self.private else ""
             if main_title and len(main_title) < 60: 
-                self.setWindowTitle(f"{main_title}")
+                self.setWindowTitle(f"{main_title}{suffix}")
             elif sender_view.url().host():
-                 self.setWindowTitle(sender_view.url().host())
+                 self.setWindowTitle(sender_view.url().host() + suffix)
             else:
-                self.setWindowTitle("Web Browser")
+                self.setWindowTitle(self.base_title)
+
+    def update_tab_icon(self, icon: QIcon, sender_view: QWebEngineView):
+        """Shows the page's favicon in its tab, remembering it for later tabs and searches."""
+        idx = self.tab_widget.indexOf(sender_view)
+        if idx == -1:
+            return
+        if icon.isNull():
+            # Between navigations the page has no icon yet; show the stored one instead of a blank
+            icon = self.favicons.icon_for_url(sender_view.url()) or QIcon()
+        elif not self.private:
+            self.favicons.store(sender_view.url(), icon)
+        self.tab_widget.setTabIcon(idx, icon)
 
     def on_load_started(self, sender_view: QWebEngineView):
         """Handles actions when a page starts loading in a tab."""
@@ -315,7 +563,8 @@ class WebBrowserWindow(QMainWindow):
         """Updates the enabled state of back and forward buttons based on current tab's history."""
         current_view = self.current_browser_view()
         if current_view and current_view.history():
-            if hasattr(self, 'back_button'): self.back_button.setEnabled(current_view.history().canGoBack())
+            if hasattr(self, 'back_button'): self.back_button.setEnabled(current_view.history().canGoBack()
+                                                                         or getattr(current_view.page(), 'replaced_page', None) is not None)
             if hasattr(self, 'forward_button'): self.forward_button.setEnabled(current_view.history().canGoForward())
         else:
             if hasattr(self, 'back_button'): self.back_button.setEnabled(False)
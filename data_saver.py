@@ -0,0 +1,213 @@
+# data_saver.py
+"""
+Data-saver mode for slow or metered links.
+
+When data saving applies to a page's site, images are not loaded automatically,
+a script pauses media that starts playing without a recent click or key press
+(autoplay, including streams fetched by script), and a per-page request
+interceptor blocks audio/video requests and web fonts. The user can load a
+page's images with one click. Data saving is switched globally, with per-site
+overrides stored in QSettings.
+
+The interceptor runs before any response arrives, so it cannot tell large media
+from small: every audio/video request is blocked. For the same reason the
+"bytes saved" counters are estimates from typical resource sizes (ESTIMATED_BYTES).
+"""
+import json
+
+from PyQt6.QtCore import QObject, QSettings, QUrl, pyqtSignal
+from PyQt6.QtWebEngineCore import (
+    QWebEnginePage, QWebEngineScript, QWebEngineSettings, QWebEngineUrlRequestInfo, QWebEngineUrlRequestInterceptor
+)
+
+ResourceType = QWebEngineUrlRequestInfo.ResourceType
+
+ESTIMATED_BYTES = {
+    ResourceType.ResourceTypeImage: 30 * 1024,
+    ResourceType.ResourceTypeFontResource: 45 * 1024,
+    ResourceType.ResourceTypeMedia: 1024 * 1024,
+}
+
+AUTOPLAY_SCRIPT_NAME = "data-saver:pause-autoplay"
+
+# Pauses playback that no user gesture started. "play" does not bubble, so it is caught in the capture phase.
+_PAUSE_AUTOPLAY_JS = """
+(function() {
+  document.addEventListener('play', function(event) {
+    var activation = navigator.userActivation;
+    if (activation && activation.isActive) { return; }
+    var media = event.target;
+    if (media && typeof media.pause === 'function') { media.autoplay = false; media.pause(); }
+  }, true);
+})();
+"""
+
+_autoplay_script = None
+
+# Counts images the page wanted but did not load because AutoLoadImages is off
+_COUNT_SKIPPED_IMAGES_JS = "Array.prototype.filter.call(document.images, function(i){return i.currentSrc||i.src;}).length"
+
+
+class DataSaverPolicy(QObject):
+    """The global switch plus per-site overrides."""
+    changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.settings = QSettings()
+        self.enabled = self.settings.value("data_saver/enabled", False, type=bool)
+        try:
+            self.sites = json.loads(self.settings.value("data_saver/sites", "{}", type=str))
+        except ValueError:
+            self.sites = {}
+        self.session_sites = {} # Overrides from private windows, never written to disk
+
+    def enabled_for(self, host: str) -> bool:
+        host = host.lower()
+        if host in self.session_sites:
+            return self.session_sites[host]
+        return self.sites.get(host, self.enabled)
+
+    def set_enabled(self, enabled: bool):
+        self.enabled = enabled
+        self.settings.setValue("data_saver/enabled", enabled)
+        self.changed.emit()
+
+    def set_site(self, host: str, enabled: bool, persist: bool = True):
+        """
+        Overrides the global switch for one site; matching the global switch clears the
+        override. Unsaved (private window) choices also override saved ones for the session.
+        """
+        host = host.lower()
+        if not host:
+            return
+        self.session_sites.pop(host, None)
+        if not persist:
+            # Session choices sit on top of saved overrides, so compare with what applies without one
+            if enabled != self.sites.get(host, self.enabled):
+                self.session_sites[host] = enabled
+            self.changed.emit()
+            return
+        if enabled == self.enabled:
+            self.sites.pop(host, None)
+        else:
+            self.sites[host] = enabled
+        self.settings.setValue("data_saver/sites", json.dumps(self.sites))
+        self.changed.emit()
+
+
+class PageDataSaver(QWebEngineUrlRequestInterceptor):
+    """
+    Per-page interceptor and counters. Qt 6 calls interceptRequest() on the UI thread,
+    so the counters need no locking.
+    """
+    state_changed = pyqtSignal()
+
+    def __init__(self, page: QWebEnginePage):
+        super().__init__(page)
+        self.page = page
+        self.active = False
+        self.images_allowed_url = None # Page the user chose to load images for
+        self.blocked_requests = 0
+        self.bytes_saved = 0
+        self.skipped_images = 0
+        page.loadFinished.connect(self.count_skipped_images)
+
+    @property
+    def images_blocked(self) -> bool:
+        return self.active and self.images_allowed_url is None
+
+    def interceptRequest(self, info: QWebEngineUrlRequestInfo):
+        if not self.active:
+            return
+        resource_type = info.resourceType()
+        if resource_type == ResourceType.ResourceTypeImage and not self.images_blocked:
+            return
+        if resource_type in ESTIMATED_BYTES:
+            info.block(True)
+            self.blocked_requests += 1
+            self.bytes_saved += ESTIMATED_BYTES[resource_type]
+            self.state_changed.emit()
+
+    def count_skipped_images(self, ok: bool):
+        if ok and self.images_blocked:
+            self.page.runJavaScript(_COUNT_SKIPPED_IMAGES_JS, self.add_skipped_images)
+
+    def add_skipped_images(self, count):
+        if isinstance(count, (int, float)) and count > 0:
+            self.skipped_images += int(count)
+            self.bytes_saved += int(count) * ESTIMATED_BYTES[ResourceType.ResourceTypeImage]
+            self.state_changed.emit()
+
+
+class DataSaver(QObject):
+    """Attaches PageDataSaver to pages and applies the policy on each main-frame navigation."""
+    def __init__(self, policy: DataSaverPolicy, parent=None):
+        super().__init__(parent)
+        self.policy = policy
+
+    def attach(self, page: QWebEnginePage) -> PageDataSaver:
+        page_saver = PageDataSaver(page)
+        page.setUrlRequestInterceptor(page_saver)
+        page.data_saver = page_saver
+        return page_saver
+
+    def apply(self, page: QWebEnginePage, url: QUrl):
+        page_saver = getattr(page, 'data_saver', None)
+        if page_saver is None:
+            return
+        if page_saver.images_allowed_url is not None and page_saver.images_allowed_url != url:
+            page_saver.images_allowed_url = None # "Load images" only covers the page it was used on
+        page_saver.active = self.policy.enabled_for(url.host())
+        settings = page.settings()
+        settings.setAttribute(QWebEngineSettings.WebAttribute.AutoLoadImages, not page_saver.images_blocked)
+        # Takes effect from the next document, which is the one being navigated to
+        scripts = page.scripts()
+        registered = scripts.find(AUTOPLAY_SCRIPT_NAME)
+        if page_saver.active and not registered:
+            scripts.insert(pause_autoplay_script())
+        elif not page_saver.active:
+            for script in registered:
+                scripts.remove(script)
+        page_saver.state_changed.emit()
+
+    def load_images(self, page: QWebEnginePage):
+        """Loads the current page's images once, leaving data saving on for everything else."""
+        page_saver = getattr(page, 'data_saver', None)
+        if page_saver is None or not page_saver.images_blocked:
+            return
+        page_saver.images_allowed_url = page.url()
+        page.settings().setAttribute(QWebEngineSettings.WebAttribute.AutoLoadImages, True)
+        page.triggerAction(QWebEnginePage.WebAction.Reload)
+        page_saver.state_changed.emit()
+
+
+def pause_autoplay_script() -> QWebEngineScript:
+    """Builds (once) the script that pauses autoplaying media in every frame."""
+    global _autoplay_script
+    if _autoplay_script is None:
+        _autoplay_script = QWebEngineScript()
+        _autoplay_script.setName(AUTOPLAY_SCRIPT_NAME)
+        _autoplay_script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
+        _autoplay_script.setWorldId(QWebEngineScript.ScriptWorldId.ApplicationWorld) # Shares the DOM, not page globals
+        _autoplay_script.setRunsOnSubFrames(True)
+        _autoplay_script.setSourceCode(_PAUSE_AUTOPLAY_JS)
+    return _autoplay_script
+
+
+def format_bytes(count: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if count < 1024:
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+
+_shared_data_saver = None
+
+
+def shared_data_saver() -> DataSaver:
+    global _shared_data_saver
+    if _shared_data_saver is None:
+        _shared_data_saver = DataSaver(DataSaverPolicy())
+    return _shared_data_saver
@@ -1,14 +1,18 @@
 # dialogs.py
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QLabel, QPushButton, QDialogButtonBox,
-    QLineEdit, QCheckBox, QMessageBox, QGroupBox
+    QLineEdit, QCheckBox, QMessageBox, QGroupBox, QListWidget, QListWidgetItem, QPlainTextEdit, QComboBox
 )
+from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEngineSettings, QWebEnginePage
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
+
+from themes import shared_theme_manager
 
 class SettingsDialog(QDialog): # For general browser preferences
     """Dialog for general browser preferences like home page."""
-    def __init__(self, current_home_page: str, parent=None):
+    def __init__(self, current_home_page: str, parent=None, predictor=None,
+                 theme_mode: str = "system", theme_modes=("system", "light", "dark")):
         super().__init__(parent)
         self.setWindowTitle("Preferences")
         self.setMinimumWidth(380)
@@ -23,8 +27,32 @@ class SettingsDialog(QDialog): # For general browser preferences
         self.home_page_input = QLineEdit(current_home_page)
         self.home_page_input.setPlaceholderText("Enter URL (e.g., https://www.example.com)")
         home_page_layout.addWidget(self.home_page_input)
+        home_page_layout.addWidget(QLabel("Appearance:"))
+        self.theme_combo = QComboBox()
+        for mode in theme_modes:
+            self.theme_combo.addItem("Follow system" if mode == "system" else mode.capitalize(), mode)
+        self.theme_combo.setCurrentIndex(max(0, self.theme_combo.findData(theme_mode)))
+        home_page_layout.addWidget(self.theme_combo)
         layout.addWidget(home_page_group)
 
+        # --- Predictive Loading Group ---
+        predict_group = QGroupBox("Predictive Loading")
+        predict_layout = QVBoxLayout(predict_group)
+        self.predict_checkbox = QCheckBox("Preload pages predicted from what you type in the address bar")
+        self.predict_checkbox.setToolTip("Learns which address you pick for what you type, then prerenders it "
+                                         "or connects to it early. Private windows never predict.")
+        self.predict_checkbox.setChecked(bool(predictor and predictor.enabled))
+        predict_layout.addWidget(self.predict_checkbox)
+        predict_layout.addWidget(QLabel("Only for these origins (one per line, e.g. https://www.example.com; example.com means https):"))
+        self.predict_origins_input = QPlainTextEdit("\n".join(sorted(predictor.allowed_origins)) if predictor else "")
+        self.predict_origins_input.setMaximumHeight(80)
+        predict_layout.addWidget(self.predict_origins_input)
+        if predictor is not None:
+            stats_label = QLabel(predictor.summary())
+            stats_label.setObjectName("InfoLabel")
+            predict_layout.addWidget(stats_label)
+        layout.addWidget(predict_group)
+
         layout.addStretch(1) # Push buttons to the bottom
 
         # Standard OK and Cancel buttons
@@ -38,14 +66,35 @@ class SettingsDialog(QDialog): # For general browser preferences
 
         layout.addWidget(button_box)
         self.setLayout(layout)
+        shared_theme_manager().style_dialog(self)
 
     def get_home_page(self) -> str:
         """Returns the entered home page URL."""
         return self.home_page_input.text().strip()
 
+    def get_theme_mode(self) -> str:
+        return self.theme_combo.currentData()
+
+    def get_predict_enabled(self) -> bool:
+        return self.predict_checkbox.isChecked()
+
+    def get_predict_origins(self) -> list[str]:
+        return self.predict_origins_input.toPlainText().split()
+
+    def accept(self):
+        from predictor import parse_origin
+        invalid = [entry for entry in self.get_predict_origins() if parse_origin(entry) is None]
+        if invalid:
+            QMessageBox.warning(self, "Invalid Origins",
+                                "These predictive loading entries are not http(s) origins:\n\n" + "\n".join(invalid))
+            self.predict_origins_input.setFocus()
+            return
+        super().accept()
+
 class SecurityDialog(QDialog): # For security and privacy settings
     """Dialog for managing security and privacy settings."""
-    def __init__(self, browser_view: QWebEngineView, profile: QWebEngineProfile, parent=None):
+    def __init__(self, browser_view: QWebEngineView, profile: QWebEngineProfile, parent=None,
+                 data_saver_policy=None, persist_site_choices: bool = True):
         super().__init__(parent)
         self.setWindowTitle("Security & Privacy")
         self.setMinimumWidth(480) 
@@ -101,6 +150,21 @@ class SecurityDialog(QDialog): # For security and privacy settings
             content_layout.addWidget(QLabel("No active page to configure content settings for."))
         main_layout.addWidget(content_group)
 
+        # --- Data Saver Group ---
+        self.data_saver_policy = data_saver_policy
+        self.persist_site_choices = persist_site_choices
+        self.data_saver_checkbox = None
+        self.site_host = self.browser_view.url().host() if self.browser_view else ""
+        if self.data_saver_policy is not None and self.site_host:
+            data_saver_group = QGroupBox("Data Saver (This Site)")
+            data_saver_layout = QVBoxLayout(data_saver_group)
+            self.data_saver_checkbox = QCheckBox(f"Save data on {self.site_host}")
+            self.data_saver_checkbox.setChecked(self.data_saver_policy.enabled_for(self.site_host))
+            self.data_saver_checkbox.setToolTip("Defers images and blocks media and web fonts on this site, "
+                                                "overriding the Data Saver toolbar switch.")
+            data_saver_layout.addWidget(self.data_saver_checkbox)
+            main_layout.addWidget(data_saver_group)
+
         # --- Profile Settings Group ---
         profile_group = QGroupBox("Browser Profile Settings (Global)")
         profile_layout = QVBoxLayout(profile_group)
@@ -137,7 +201,7 @@ class SecurityDialog(QDialog): # For security and privacy settings
 
         clear_all_data_button = QPushButton("Clear All Browsing Data")
         clear_all_data_button.setObjectName("ClearDataButton")
-        clear_all_data_button.setToolTip("Clears cookies, cache, visited links, and other browsing data.")
+        clear_all_data_button.setToolTip("Clears cookies, cache, visited links, the page text index, and other browsing data.")
         clear_all_data_button.clicked.connect(self.clear_all_browsing_data)
         actions_layout.addWidget(clear_all_data_button)
         
@@ -154,6 +218,7 @@ class SecurityDialog(QDialog): # For security and privacy settings
         button_box.rejected.connect(self.reject)
         main_layout.addWidget(button_box)
         self.setLayout(main_layout)
+        shared_theme_manager().style_dialog(self)
 
     def apply_all_settings(self):
         settings_changed_count = 0
@@ -176,6 +241,12 @@ class SecurityDialog(QDialog): # For security and privacy settings
                 print("DNT header set to 0 for the profile.")
             settings_changed_count +=1 # Count DNT change as a setting change
 
+        if self.data_saver_checkbox is not None:
+            save_data = self.data_saver_checkbox.isChecked()
+            if save_data != self.data_saver_policy.enabled_for(self.site_host):
+                self.data_saver_policy.set_site(self.site_host, save_data, persist=self.persist_site_choices)
+                settings_changed_count += 1
+
         if settings_changed_count > 0:
             QMessageBox.information(self, "Settings Applied", 
                                    f"{settings_changed_count} setting(s) have been applied.\nSome content settings may require a page reload to take full effect.")
@@ -204,8 +275,15 @@ class SecurityDialog(QDialog): # For security and privacy settings
                 QMessageBox.information(self, "Cache Cleared", "HTTP cache has been cleared.")
             
     def clear_all_browsing_data(self):
-        reply = QMessageBox.question(self, "Confirm Clear All Browsing Data",
-                                     "This will clear cookies, HTTP cache, and visited links history. This action cannot be undone. Are you sure?",
+        # A private window's own profile is all it may clear; the index, icons and predictions belong to normal windows
+        private = getattr(self.parent(), 'private', False)
+        if private:
+            question = ("This will clear this private session's cookies, HTTP cache and visited links history. "
+                        "Data saved by normal windows is not affected. Are you sure?")
+        else:
+            question = ("This will clear cookies, HTTP cache, visited links history, the page text index, saved site icons "
+                        "and learned address predictions. This action cannot be undone. Are you sure?")
+        reply = QMessageBox.question(self, "Confirm Clear All Browsing Data", question,
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                                      QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
@@ -213,6 +291,91 @@ class SecurityDialog(QDialog): # For security and privacy settings
                 self.profile.clearAllVisitedLinks() 
                 self.profile.clearHttpCache()
                 self.profile.cookieStore().deleteAllCookies()
+                if private:
+                    QMessageBox.information(self, "Browsing Data Cleared",
+                                            "This private session's cookies, HTTP cache and visited links history have been cleared.")
+                    return
+                index_cleared = True
+                if hasattr(self.parent(), 'clear_page_index'): index_cleared = self.parent().clear_page_index()
+                if hasattr(self.parent(), 'clear_predictions'): self.parent().clear_predictions()
+                if hasattr(self.parent(), 'clear_favicons'): self.parent().clear_favicons()
+                if not index_cleared:
+                    QMessageBox.warning(self, "Browsing Data Partly Cleared",
+                                        "Cookies, HTTP cache, visited links history, saved site icons and learned address predictions have been cleared, "
+                                        "but the page text index is still busy. Try again in a moment.")
+                    return
                 QMessageBox.information(self, "Browsing Data Cleared", 
-                                        "Cookies, HTTP cache, and visited links history have been cleared.")
+                                        "Cookies, HTTP cache, visited links history, the page text index, saved site icons and learned address predictions have been cleared.")
+
+
+class PageSearchDialog(QDialog): # For searching the text of visited pages
+    """Search-as-you-type over the full-text index of visited pages and open tabs."""
+    def __init__(self, searcher, open_callback, parent=None, icon_callback=None):
+        super().__init__(parent)
+        self.setWindowTitle("Search Visited Pages")
+        self.setMinimumSize(560, 420)
+        self.searcher = searcher # page_index.PageSearcher; queries run off the GUI thread
+        self.latest_query_id = None
+        self.searcher.results_ready.connect(self.show_results)
+        self.finished.connect(lambda _: self.searcher.results_ready.disconnect(self.show_results))
+        self.open_callback = open_callback # url str -> None
+        self.icon_callback = icon_callback # url str -> QIcon | None
+
+        layout = QVBoxLayout(self)
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText("Search the text of pages you have visited...")
+        self.query_input.textChanged.connect(lambda _: self.search_timer.start())
+        self.query_input.returnPressed.connect(self.open_selected)
+        layout.addWidget(self.query_input)
+
+        self.status_label = QLabel("")
+        self.status_label.setObjectName("InfoLabel")
+        layout.addWidget(self.status_label)
+
+        self.results_list = QListWidget()
+        self.results_list.setWordWrap(True)
+        self.results_list.itemActivated.connect(lambda item: self.open_selected())
+        layout.addWidget(self.results_list)
+
+        # Debounce keystrokes so fast typing runs one query, not one per character
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(120)
+        self.search_timer.timeout.connect(self.run_search)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+        self.setLayout(layout)
+        shared_theme_manager().style_dialog(self)
+
+    def run_search(self):
+        query = self.query_input.text()
+        if not query.strip():
+            self.latest_query_id = None
+            self.results_list.clear()
+            self.status_label.setText("")
+            return
+        self.latest_query_id = self.searcher.search(query)
+        self.status_label.setText("Searching...")
+
+    def show_results(self, query_id: int, hits: list, elapsed_ms: float):
+        if query_id != self.latest_query_id: # Superseded while it ran
+            return
+        self.results_list.clear()
+        for hit in hits:
+            item = QListWidgetItem(f"{hit.title}\n{hit.url}\n{hit.snippet}")
+            item.setData(Qt.ItemDataRole.UserRole, hit.url)
+            item.setToolTip(hit.url)
+            if self.icon_callback and (icon := self.icon_callback(hit.url)):
+                item.setIcon(icon)
+            self.results_list.addItem(item)
+        if hits:
+            self.results_list.setCurrentRow(0)
+        self.status_label.setText(f"{len(hits)} result(s) in {elapsed_ms:.1f} ms")
 
+    def open_selected(self):
+        item = self.results_list.currentItem()
+        if item is not None:
+            self.open_callback(item.data(Qt.ItemDataRole.UserRole))
+            self.accept()
@@ -0,0 +1,270 @@
+# favicon_store.py
+"""
+Persistent, deduplicated favicon storage.
+
+Icons are stored once, keyed by the SHA-1 of their PNG encoding, in a single
+append-only file that is read through mmap. The file holds two record kinds:
+
+    ICON  digest(20) + PNG bytes
+    MAP   digest(20) + UTF-8 key   ("url:<scheme://host/path>" or "host:<host>")
+
+Later MAP records win, so remapping a page never rewrites the file; superseded
+records are dropped by compaction when the store is opened. Decoded QIcons are
+kept in a bounded LRU, so restoring many tabs of the same site decodes its icon once.
+Page keys leave out the query, fragment and user info, so the file does not keep
+search terms or tokens; clear() empties it along with other browsing data.
+"""
+import hashlib
+import mmap
+import os
+import struct
+from collections import OrderedDict
+
+from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, QUrl
+from PyQt6.QtGui import QIcon, QPixmap
+
+MAGIC = b"EBFAVIC1"
+RECORD_HEADER = struct.Struct("<BI") # kind, payload length
+KIND_ICON = 1
+KIND_MAP = 2
+DIGEST_SIZE = 20
+
+ICON_SIZE = 32 # Icons are normalised to this size before hashing, so re-served icons dedupe
+MAX_DECODED_ICONS = 256
+MAX_URL_KEYS = 20_000 # URL mappings kept by compaction; host mappings are always kept
+COMPACT_MIN_BYTES = 256 * 1024
+COMPACT_GARBAGE_RATIO = 0.5
+
+
+class FaviconStore:
+    """Maps page URLs and hosts to deduplicated icons stored in one file."""
+    def __init__(self, path: str, max_decoded: int = MAX_DECODED_ICONS):
+        self.path = path
+        self.max_decoded = max_decoded
+        self.icons = {} # digest -> (offset, length) of the PNG bytes
+        self.keys = OrderedDict() # key -> digest, oldest mapping first
+        self.decoded = OrderedDict() # digest -> QIcon, least recently used first
+        self.decode_count = 0
+        self._map = None
+        self._file = None
+        self._garbage_bytes = 0
+
+        if not os.path.exists(path) or os.path.getsize(path) < len(MAGIC):
+            with open(path, "wb") as f:
+                f.write(MAGIC)
+        try:
+            self._scan()
+        except ValueError as e:
+            # Only a cache: set the unreadable file aside and start empty rather than failing startup
+            print(f"{e}; moving it to {path}.corrupt and starting a new favicon store.")
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            os.replace(path, path + ".corrupt")
+            with open(path, "wb") as f:
+                f.write(MAGIC)
+            self._scan()
+        if (os.path.getsize(path) > COMPACT_MIN_BYTES
+                and self._garbage_bytes > os.path.getsize(path) * COMPACT_GARBAGE_RATIO) \
+                or len(self.keys) > MAX_URL_KEYS * 1.5 \
+                or any(key.startswith("url:") and "?" in key for key in self.keys): # Written by older versions
+            self.compact()
+        self._file = open(path, "ab")
+
+    # --- File access ---
+
+    def _mapped(self) -> mmap.mmap:
+        """The read-only mapping, remapped when appends have grown the file."""
+        size = os.path.getsize(self.path)
+        if self._map is None or len(self._map) != size:
+            if self._map is not None:
+                self._map.close()
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _scan(self):
+        self.icons.clear()
+        self.keys.clear()
+        self._garbage_bytes = 0
+        data = self._mapped()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a favicon store")
+        offset = len(MAGIC)
+        while offset + RECORD_HEADER.size <= len(data):
+            kind, length = RECORD_HEADER.unpack_from(data, offset)
+            payload = offset + RECORD_HEADER.size
+            if payload + length > len(data) or length < DIGEST_SIZE:
+                break # Torn write at the end of the file
+            digest = bytes(data[payload:payload + DIGEST_SIZE])
+            if kind == KIND_ICON:
+                self.icons[digest] = (payload + DIGEST_SIZE, length - DIGEST_SIZE)
+            elif kind == KIND_MAP:
+                key = bytes(data[payload + DIGEST_SIZE:payload + length]).decode("utf-8", "replace")
+                if key in self.keys:
+                    self._garbage_bytes += RECORD_HEADER.size + length
+                    del self.keys[key]
+                self.keys[key] = digest
+            offset = payload + length
+        if offset < len(data):
+            self._map.close()
+            self._map = None
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+
+    def _append(self, kind: int, payload: bytes) -> int:
+        """Appends a record and returns the file offset of its payload."""
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell() + RECORD_HEADER.size
+        self._file.write(RECORD_HEADER.pack(kind, len(payload)) + payload)
+        self._file.flush()
+        return offset
+
+    def compact(self):
+        """Rewrites the file with only live records, keeping the newest MAX_URL_KEYS URL mappings."""
+        url_keys = [key for key in self.keys if key.startswith("url:")]
+        dropped = set(url_keys[:max(0, len(url_keys) - MAX_URL_KEYS)])
+        dropped.update(key for key in url_keys if "?" in key) # Keys that still carry a query string
+        live_keys = [(key, digest) for key, digest in self.keys.items() if key not in dropped]
+        live_digests = {digest for _, digest in live_keys}
+
+        data = self._mapped()
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(MAGIC)
+            for digest, (offset, length) in self.icons.items():
+                if digest in live_digests:
+                    f.write(RECORD_HEADER.pack(KIND_ICON, DIGEST_SIZE + length) + digest + data[offset:offset + length])
+            for key, digest in live_keys:
+                encoded = key.encode("utf-8")
+                f.write(RECORD_HEADER.pack(KIND_MAP, DIGEST_SIZE + len(encoded)) + digest + encoded)
+        self._map.close()
+        self._map = None
+        reopen = self._file is not None
+        if reopen:
+            self._file.close()
+        os.replace(temp_path, self.path)
+        self._scan()
+        if reopen:
+            self._file = open(self.path, "ab")
+
+    def clear(self):
+        """Forgets every icon and mapping and truncates the file to its header."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        reopen = self._file is not None
+        if reopen:
+            self._file.close()
+        with open(self.path, "wb") as f:
+            f.write(MAGIC)
+        self.icons.clear()
+        self.keys.clear()
+        self.decoded.clear()
+        self._garbage_bytes = 0
+        if reopen:
+            self._file = open(self.path, "ab")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    # --- Lookups ---
+
+    @staticmethod
+    def url_key(url: QUrl) -> str:
+        option = QUrl.UrlFormattingOption
+        return "url:" + url.adjusted(option.RemoveQuery | option.RemoveFragment | option.RemoveUserInfo).toString()
+
+    @staticmethod
+    def host_key(url: QUrl) -> str | None:
+        return ("host:" + url.host().lower()) if url.host() else None
+
+    def digest_for(self, url: QUrl) -> bytes | None:
+        digest = self.keys.get(self.url_key(url))
+        if digest is None and (host_key := self.host_key(url)):
+            digest = self.keys.get(host_key)
+        return digest
+
+    def icon_for_url(self, url: QUrl) -> QIcon | None:
+        """The stored icon for a page, falling back to its host's icon."""
+        digest = self.digest_for(url)
+        return self.icon_for_digest(digest) if digest else None
+
+    def icon_for_digest(self, digest: bytes) -> QIcon | None:
+        icon = self.decoded.get(digest)
+        if icon is not None:
+            self.decoded.move_to_end(digest)
+            return icon
+        location = self.icons.get(digest)
+        if location is None:
+            return None
+        offset, length = location
+        pixmap = QPixmap()
+        if not pixmap.loadFromData(self._mapped()[offset:offset + length], "PNG"):
+            return None
+        self.decode_count += 1
+        icon = QIcon(pixmap)
+        self._remember(digest, icon)
+        return icon
+
+    def _remember(self, digest: bytes, icon: QIcon):
+        self.decoded[digest] = icon
+        self.decoded.move_to_end(digest)
+        while len(self.decoded) > self.max_decoded:
+            self.decoded.popitem(last=False)
+
+    # --- Writes ---
+
+    def store(self, url: QUrl, icon: QIcon):
+        """Records `icon` for the page and its host; identical icons are stored once."""
+        if icon.isNull() or self._file is None:
+            return
+        png = encode_png(icon.pixmap(ICON_SIZE, ICON_SIZE))
+        if not png:
+            return
+        digest = hashlib.sha1(png).digest()
+        if digest not in self.icons:
+            offset = self._append(KIND_ICON, digest + png)
+            self.icons[digest] = (offset + DIGEST_SIZE, len(png))
+        if digest not in self.decoded:
+            self._remember(digest, icon) # Already decoded by Qt; keep it rather than re-decoding later
+        for key in (self.url_key(url), self.host_key(url)):
+            if key and self.keys.get(key) != digest:
+                self.keys.pop(key, None)
+                self.keys[key] = digest
+                self._append(KIND_MAP, digest + key.encode("utf-8"))
+
+    def stats(self) -> dict:
+        return {
+            "icons": len(self.icons),
+            "keys": len(self.keys),
+            "decoded_cached": len(self.decoded),
+            "decodes": self.decode_count,
+            "file_bytes": os.path.getsize(self.path),
+        }
+
+
+def encode_png(pixmap: QPixmap) -> bytes:
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    ok = pixmap.save(buffer, "PNG")
+    buffer.close()
+    return bytes(data) if ok else b""
+
+
+_shared_store = None
+
+
+def shared_favicon_store() -> FaviconStore:
+    """The application-wide store in the user data directory."""
+    global _shared_store
+    if _shared_store is None:
+        from paths import app_data_path
+        _shared_store = FaviconStore(app_data_path("favicons.bin"))
+    return _shared_store
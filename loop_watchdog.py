@@ -0,0 +1,205 @@
+# loop_watchdog.py
+"""
+GUI event-loop watchdog.
+
+A coarse QTimer on the GUI thread records a heartbeat every PING_INTERVAL_MS.
+A daemon thread checks the heartbeat; once it is older than STALL_THRESHOLD_S
+the loop is stalled, and the thread samples the main thread's Python stack via
+sys._current_frames() until the loop recovers. Each stall is then written to a
+rotating log together with the last known state of the active tab (snapshotted
+on the GUI thread, since Qt objects must not be touched from the watchdog thread)
+and the session's stall-duration histogram.
+
+Note that modal dialogs (QMessageBox.exec() and friends) run a nested event loop,
+so they do not stall the heartbeat; a stall means a slot really held the thread.
+"""
+import logging
+import sys
+import threading
+import time
+import traceback
+from logging.handlers import RotatingFileHandler
+
+from PyQt6.QtCore import QObject, QTimer, Qt
+from PyQt6.QtWidgets import QApplication
+
+PING_INTERVAL_MS = 100
+STALL_THRESHOLD_S = 0.5
+SAMPLE_INTERVAL_S = 0.5 # Stack samples taken while a stall lasts
+MAX_SAMPLES = 8
+STACK_LIMIT = 40 # Innermost frames kept per sample
+STATE_EVERY_BEATS = 5 # Active tab state is snapshotted every this many heartbeats
+HISTOGRAM_BUCKETS_S = (0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+
+
+def active_tab_state() -> dict:
+    """The current tab of the active (or first) browser window, plus any modal dialog. GUI thread only."""
+    windows = [w for w in QApplication.topLevelWidgets() if hasattr(w, 'current_browser_view')]
+    active = QApplication.activeWindow()
+    window = active if active in windows else (windows[0] if windows else None)
+    state = {}
+    modal = QApplication.activeModalWidget()
+    if modal is not None:
+        state["modal"] = f"{type(modal).__name__} {modal.windowTitle()!r}"
+    if window is None:
+        return state
+    state["windows"] = len(windows)
+    state["tabs"] = window.tab_widget.count()
+    view = window.current_browser_view()
+    if view is not None:
+        state.update(tab=window.tab_widget.currentIndex(), url=view.url().toString()[:300],
+                     loading=view.isLoading(), title=view.title()[:120])
+    return state
+
+
+def histogram_label(index: int) -> str:
+    if index < len(HISTOGRAM_BUCKETS_S) - 1:
+        return f"{HISTOGRAM_BUCKETS_S[index]:g}-{HISTOGRAM_BUCKETS_S[index + 1]:g}s"
+    return f">={HISTOGRAM_BUCKETS_S[-1]:g}s"
+
+
+class EventLoopWatchdog(QObject):
+    """Detects GUI-thread stalls and logs where the main thread was stuck."""
+    def __init__(self, log_path: str, threshold_s: float = STALL_THRESHOLD_S, state_provider=active_tab_state,
+                 parent=None):
+        super().__init__(parent)
+        self.log_path = log_path
+        self.threshold_s = threshold_s
+        self.state_provider = state_provider
+        self.main_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.last_gap = (0.0, 0.0) # (heartbeat before, heartbeat after) the latest stall, set on the GUI thread
+        self.beats = 0
+        self.state = {}
+        self.stall_count = 0
+        self.longest_stall_s = 0.0
+        self.histogram = [0] * len(HISTOGRAM_BUCKETS_S)
+
+        self.logger = logging.getLogger("encrypt_browser.watchdog")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.handler = None
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.setInterval(PING_INTERVAL_MS)
+        self.timer.timeout.connect(self.beat)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if self.handler is None:
+            self.handler = RotatingFileHandler(self.log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                               encoding="utf-8", delay=True)
+            self.handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.logger.addHandler(self.handler)
+        self.beat()
+        self.timer.start()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="EventLoopWatchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops watching and writes the session histogram, if there were stalls."""
+        if self._thread is None:
+            return
+        self.timer.stop()
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        if self.stall_count:
+            self.logger.info("Session summary: %d stall(s), longest %.2fs, histogram %s",
+                             self.stall_count, self.longest_stall_s, self.histogram_text())
+        if self.handler is not None:
+            self.logger.removeHandler(self.handler)
+            self.handler.close()
+            self.handler = None
+
+    # --- GUI thread ---
+
+    def beat(self):
+        now = time.monotonic()
+        if now - self.last_beat >= self.threshold_s:
+            self.last_gap = (self.last_beat, now)
+        self.beats += 1
+        if self.beats % STATE_EVERY_BEATS == 1:
+            try:
+                self.state = self.state_provider()
+            except RuntimeError: # A window or view was deleted under us; try again next time
+                pass
+        self.last_beat = now
+
+    # --- Watchdog thread ---
+
+    def _watch(self):
+        check_interval = min(self.threshold_s / 2, PING_INTERVAL_MS / 1000)
+        while not self._stop.wait(check_interval):
+            stalled_since = self.last_beat
+            if time.monotonic() - stalled_since < self.threshold_s:
+                continue
+            samples = []
+            while not self._stop.is_set() and self.last_beat == stalled_since:
+                if len(samples) < MAX_SAMPLES:
+                    samples.append(self._main_thread_stack())
+                self._stop.wait(SAMPLE_INTERVAL_S)
+            started, ended = self.last_gap
+            if started != stalled_since: # Stopped mid-stall
+                ended = time.monotonic()
+            # Measured between heartbeats, so this includes up to one normal ping interval
+            self._record(ended - stalled_since, samples)
+
+    def _main_thread_stack(self) -> str:
+        frame = sys._current_frames().get(self.main_thread_id)
+        if frame is None:
+            return "(main thread has no Python frame)"
+        return "".join(traceback.format_stack(frame, limit=STACK_LIMIT))
+
+    def _record(self, duration_s: float, samples: list[str]):
+        self.stall_count += 1
+        self.longest_stall_s = max(self.longest_stall_s, duration_s)
+        bucket = 0
+        while bucket < len(HISTOGRAM_BUCKETS_S) - 1 and duration_s >= HISTOGRAM_BUCKETS_S[bucket + 1]:
+            bucket += 1
+        self.histogram[bucket] += 1
+
+        lines = [f"GUI stall of {duration_s:.2f}s; tab state {self.state}; histogram {self.histogram_text()}"]
+        # Consecutive identical samples are collapsed: a long stall in one slot logs its stack once
+        previous, repeats = None, 0
+        for stack in samples + [None]:
+            if stack == previous:
+                repeats += 1
+                continue
+            if previous is not None:
+                lines.append(f"  Main thread stack (seen in {repeats} sample(s)):\n{previous.rstrip()}")
+            previous, repeats = stack, 1
+        self.logger.warning("\n".join(lines))
+
+    def histogram_text(self) -> str:
+        return ", ".join(f"{histogram_label(i)}: {count}" for i, count in enumerate(self.histogram) if count) or "empty"
+
+    def stats(self) -> dict:
+        return {
+            "running": self._thread is not None,
+            "threshold_s": self.threshold_s,
+            "stalls": self.stall_count,
+            "longest_stall_s": round(self.longest_stall_s, 3),
+            "histogram": {histogram_label(i): count for i, count in enumerate(self.histogram)},
+            "log_path": self.log_path,
+        }
+
+
+_shared_watchdog = None
+
+
+def shared_watchdog() -> EventLoopWatchdog:
+    """The application-wide watchdog, logging to logs/stalls.log in the user data directory."""
+    global _shared_watchdog
+    if _shared_watchdog is None:
+        from paths import app_data_path
+        _shared_watchdog = EventLoopWatchdog(app_data_path("logs", "stalls.log"))
+    return _shared_watchdog
@@ -0,0 +1,480 @@
+# page_index.py
+"""
+Full-text index of visited page content.
+
+After a page finishes loading, PageTextCollector extracts its text with
+toPlainText() in a throttled pass that backs off while the foreground tab is
+loading. Tokenizing and writing happen on IndexWorker's background thread into
+PageTextIndex, an incremental inverted index stored in SQLite with document and
+size limits (least recently visited pages are evicted first). Queries are BM25
+ranked and run by PageSearcher on a thread of their own with a separate read
+connection, so they neither wait on indexing nor block the GUI thread.
+Deleted pages are overwritten on disk (secure_delete), and clearing the index
+also vacuums the file, so cleared browsing data does not linger in free pages.
+"""
+import hashlib
+import math
+import queue
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+
+from PyQt6.QtCore import QCoreApplication, QObject, QTimer, pyqtSignal
+
+MAX_TEXT_CHARS = 200_000 # Text kept per page; the rest of very long pages is ignored
+MAX_QUERY_TERMS = 8
+MAX_PREFIX_EXPANSIONS = 16 # Terms matched by the last, still-being-typed query word
+MAX_CANDIDATES = 2000 # Postings read for the rarest query term
+SNIPPET_RADIUS = 80
+BM25_K1 = 1.2
+BM25_B = 0.75
+TOTALS_CACHE_S = 5.0
+
+EXTRACT_INTERVAL_MS = 750 # At most one extraction per interval
+EXTRACT_DELAY_S = 1.5 # Let pages settle (late scripts, lazy content) before extracting
+WORKER_QUEUE_SIZE = 256
+WORKER_BATCH_SIZE = 32
+
+CLEAR_TIMEOUT_S = 10.0
+
+_TOKEN_RE = re.compile(r"[^\W_]{2,40}")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+@dataclass
+class SearchHit:
+    url: str
+    title: str
+    snippet: str
+    score: float
+    visited: float
+
+
+class PageTextIndex:
+    """
+    Inverted index over page text. `postings` holds per-document term frequencies,
+    `terms` the document frequency of each term, and `documents` the zlib-compressed
+    text used for snippets. Each instance owns one SQLite connection, so use one
+    instance per thread.
+    """
+    def __init__(self, path: str, max_documents: int = 100_000, max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.max_documents = max_documents
+        self.max_bytes = max_bytes
+        self._totals = None
+        self.db = sqlite3.connect(path, timeout=5.0)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA secure_delete=ON")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY, url TEXT UNIQUE NOT NULL, title TEXT,
+                body BLOB, digest TEXT, length INTEGER, size INTEGER, visited REAL);
+            CREATE INDEX IF NOT EXISTS documents_visited ON documents(visited);
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL, doc INTEGER NOT NULL, tf INTEGER NOT NULL,
+                PRIMARY KEY (term, doc)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_doc ON postings(doc);
+            CREATE INDEX IF NOT EXISTS postings_tf ON postings(term, tf DESC);
+            CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, df INTEGER NOT NULL) WITHOUT ROWID;
+        """)
+
+    def close(self):
+        self.db.close()
+
+    # --- Writing ---
+
+    def add(self, url: str, title: str, text: str, visited: float | None = None):
+        """Indexes (or re-indexes) one page. Unchanged text only refreshes the visit time."""
+        self.add_many([(url, title, text, visited)])
+
+    def add_many(self, pages: list[tuple]):
+        """Indexes several (url, title, text, visited) pages in a single transaction."""
+        with self.db:
+            for url, title, text, visited in pages:
+                self._add_document(url, title, text, visited or time.time())
+            self._evict()
+
+    def _add_document(self, url: str, title: str, text: str, visited: float):
+        text = text[:MAX_TEXT_CHARS]
+        digest = hashlib.sha1(text.encode("utf-8", "replace")).hexdigest()
+        row = self.db.execute("SELECT id, digest FROM documents WHERE url = ?", (url,)).fetchone()
+        if row and row[1] == digest:
+            self.db.execute("UPDATE documents SET visited = ?, title = ? WHERE id = ?", (visited, title, row[0]))
+            return
+        if row:
+            self._remove_document(row[0])
+
+        tokens = tokenize(text)
+        if not tokens:
+            return
+        body = zlib.compress(text.encode("utf-8"), 6)
+        cursor = self.db.execute(
+            "INSERT INTO documents (url, title, body, digest, length, size, visited) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, title, body, digest, len(tokens), len(body), visited))
+        doc_id = cursor.lastrowid
+        frequencies = Counter(tokens)
+        self.db.executemany("INSERT INTO postings (term, doc, tf) VALUES (?, ?, ?)",
+                            ((term, doc_id, tf) for term, tf in frequencies.items()))
+        self.db.executemany("INSERT INTO terms (term, df) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1",
+                            ((term,) for term in frequencies))
+
+    def _remove_document(self, doc_id: int):
+        terms = [row[0] for row in self.db.execute("SELECT term FROM postings WHERE doc = ?", (doc_id,))]
+        self.db.executemany("UPDATE terms SET df = df - 1 WHERE term = ?", ((term,) for term in terms))
+        self.db.executemany("DELETE FROM terms WHERE term = ? AND df <= 0", ((term,) for term in terms))
+        self.db.execute("DELETE FROM postings WHERE doc = ?", (doc_id,))
+        self.db.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+    def used_bytes(self) -> int:
+        """Bytes of the database file in use: documents, postings, terms and their indexes."""
+        page_size = self.db.execute("PRAGMA page_size").fetchone()[0]
+        page_count = self.db.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = self.db.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def _evict(self):
+        """
+        Drops least recently visited pages until both limits have 10% headroom. The
+        size limit applies to the whole database (postings usually outweigh the
+        compressed text); freed pages are reused by later inserts.
+        """
+        count = self.db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        size = self.used_bytes()
+        if count <= self.max_documents and size <= self.max_bytes:
+            return
+        target_count, target_size = int(self.max_documents * 0.9), int(self.max_bytes * 0.9)
+        while count and (count > target_count or size > target_size):
+            # Estimate how many pages to drop from the average footprint, then measure again
+            per_document = size / count
+            excess = max(count - target_count, math.ceil((size - target_size) / per_document), 1)
+            doc_ids = [row[0] for row in self.db.execute(
+                "SELECT id FROM documents ORDER BY visited LIMIT ?", (excess,))]
+            for doc_id in doc_ids:
+                self._remove_document(doc_id)
+            count -= len(doc_ids)
+            size = self.used_bytes()
+
+    def remove_url(self, url: str):
+        with self.db:
+            row = self.db.execute("SELECT id FROM documents WHERE url = ?", (url,)).fetchone()
+            if row:
+                self._remove_document(row[0])
+
+    def clear(self):
+        """Removes every page, then vacuums so no page text is left in the file or its WAL."""
+        with self.db:
+            self.db.execute("DELETE FROM postings")
+            self.db.execute("DELETE FROM terms")
+            self.db.execute("DELETE FROM documents")
+        self.db.execute("VACUUM")
+        self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._totals = None
+
+    # --- Querying ---
+
+    def search(self, query: str, limit: int = 20) -> list[SearchHit]:
+        """
+        Returns pages containing every query word, best BM25 score first. The last
+        word also matches as a prefix so results update while the user is typing.
+        """
+        words = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+        if not words:
+            return []
+        total_docs, total_length = self._corpus_totals()
+        if not total_docs:
+            return []
+        average_length = total_length / total_docs
+
+        # Each query word becomes a group of (term, df); the last word expands to its prefixes
+        groups = []
+        for position, word in enumerate(words):
+            if position == len(words) - 1 and not query.endswith(" "):
+                rows = self.db.execute(
+                    "SELECT term, df FROM terms WHERE term >= ? AND term < ? ORDER BY df DESC LIMIT ?",
+                    (word, word + "\uffff", MAX_PREFIX_EXPANSIONS)).fetchall()
+            else:
+                rows = self.db.execute("SELECT term, df FROM terms WHERE term = ?", (word,)).fetchall()
+            if not rows:
+                return []
+            groups.append(rows)
+
+        # Start from the rarest word so the candidate set is as small as possible
+        groups.sort(key=lambda rows: sum(df for _, df in rows))
+        matches = None # doc -> list of (idf, tf) for the matched terms
+        for rows in groups:
+            group_matches = {}
+            for term, df in rows:
+                idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                if matches is None:
+                    postings = self.db.execute(
+                        "SELECT doc, tf FROM postings WHERE term = ? ORDER BY tf DESC LIMIT ?",
+                        (term, MAX_CANDIDATES)).fetchall()
+                else:
+                    postings = self._select_in("SELECT doc, tf FROM postings WHERE term = ? AND doc IN ({})",
+                                               (term,), list(matches))
+                for doc, tf in postings:
+                    group_matches.setdefault(doc, []).append((idf, tf))
+            if matches is None:
+                matches = group_matches
+            else:
+                matches = {doc: matches[doc] + terms for doc, terms in group_matches.items()}
+            if not matches:
+                return []
+
+        # Length normalisation needs the document lengths, fetched only for the candidates
+        lengths = dict(self._select_in("SELECT id, length FROM documents WHERE id IN ({})", (), list(matches)))
+        ranked = []
+        for doc, terms in matches.items():
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths.get(doc, average_length) / average_length)
+            score = sum(idf * tf * (BM25_K1 + 1) / (tf + norm) for idf, tf in terms)
+            ranked.append((score, doc))
+        ranked.sort(reverse=True)
+
+        hits = []
+        pattern = re.compile("|".join(re.escape(word) for word in words), re.IGNORECASE)
+        for score, doc in ranked[:limit]:
+            url, title, body, visited = self.db.execute(
+                "SELECT url, title, body, visited FROM documents WHERE id = ?", (doc,)).fetchone()
+            text = zlib.decompress(body).decode("utf-8", "replace")
+            hits.append(SearchHit(url, title or url, make_snippet(text, pattern), score, visited))
+        return hits
+
+    def _corpus_totals(self) -> tuple[int, int]:
+        """Document count and total token length, cached briefly since both change slowly."""
+        now = time.monotonic()
+        if self._totals is None or now - self._totals[0] > TOTALS_CACHE_S:
+            totals = self.db.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents").fetchone()
+            self._totals = (now, totals)
+        return self._totals[1]
+
+    def _select_in(self, sql: str, params: tuple, ids: list[int], chunk: int = 900) -> list[tuple]:
+        """Runs `sql` with its IN ({}) placeholder filled in chunks, below SQLite's variable limit."""
+        rows = []
+        for offset in range(0, len(ids), chunk):
+            batch = ids[offset:offset + chunk]
+            rows += self.db.execute(sql.format(",".join("?" * len(batch))), (*params, *batch)).fetchall()
+        return rows
+
+
+def make_snippet(text: str, pattern: re.Pattern) -> str:
+    match = pattern.search(text)
+    start = max(0, match.start() - SNIPPET_RADIUS) if match else 0
+    end = min(len(text), (match.end() if match else 0) + SNIPPET_RADIUS)
+    snippet = " ".join(text[start:end].split())
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(text) else "")
+
+
+class _ClearRequest:
+    """Worker queue marker for clear(); `done` is set once the index is empty."""
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class IndexWorker(threading.Thread):
+    """
+    Background thread that tokenizes and writes pages into the index. It is a
+    daemon so a hung write cannot keep the process alive, but shared_index_worker()
+    stops it on aboutToQuit so the last batch is committed and the database closed.
+    """
+    def __init__(self, path: str, **index_options):
+        super().__init__(name="PageIndexWorker", daemon=True)
+        self.path = path
+        self.index_options = index_options
+        self.jobs = queue.Queue(maxsize=WORKER_QUEUE_SIZE)
+
+    def submit(self, url: str, title: str, text: str) -> bool:
+        """Queues a page for indexing; drops it (returning False) if the worker is saturated."""
+        try:
+            self.jobs.put_nowait((url, title, text, time.time()))
+            return True
+        except queue.Full:
+            return False
+
+    def clear(self, timeout: float = CLEAR_TIMEOUT_S) -> bool:
+        """
+        Drops pages still waiting to be indexed and removes every indexed page,
+        waiting until that is done. Returns False if it did not finish in time.
+        """
+        stopping = False
+        while True:
+            try:
+                stopping |= self.jobs.get_nowait() is None
+            except queue.Empty:
+                break
+        request = _ClearRequest()
+        if self.is_alive() and not stopping:
+            self.jobs.put(request)
+            return request.done.wait(timeout)
+        index = PageTextIndex(self.path, **self.index_options)
+        try:
+            index.clear()
+        finally:
+            index.close()
+        return True
+
+    def stop(self):
+        if self.is_alive():
+            self.jobs.put(None)
+            self.join(timeout=5.0)
+
+    def run(self):
+        index = PageTextIndex(self.path, **self.index_options)
+        try:
+            carried = [] # A marker read while batching, handled right after that batch
+            while (job := carried.pop() if carried else self.jobs.get()) is not None:
+                if isinstance(job, _ClearRequest):
+                    try:
+                        index.clear()
+                    except sqlite3.Error as e:
+                        print(f"Page index error while clearing: {e}")
+                    else:
+                        job.done.set()
+                    continue
+                # Whatever queued up meanwhile goes into the same transaction
+                batch = [job]
+                while len(batch) < WORKER_BATCH_SIZE and not self.jobs.empty():
+                    job = self.jobs.get_nowait()
+                    if job is None or isinstance(job, _ClearRequest):
+                        carried.append(job)
+                        break
+                    batch.append(job)
+                try:
+                    index.add_many(batch)
+                except sqlite3.Error as e:
+                    print(f"Page index error ({len(batch)} page(s), first {batch[0][0]}): {e}")
+        finally:
+            index.close()
+
+
+class PageSearcher(QObject):
+    """
+    Runs searches on a background thread with its own read connection. Only the
+    newest query matters: a new one interrupts the running query and replaces any
+    query still waiting. Results arrive on the GUI thread through results_ready.
+    """
+    results_ready = pyqtSignal(int, object, float) # query id, list[SearchHit], elapsed ms
+
+    def __init__(self, path: str, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self._condition = threading.Condition()
+        self._pending = None # (query id, query, limit) not started yet
+        self._running = None # Index whose query is executing, so it can be interrupted
+        self._serial = 0
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="PageSearch", daemon=True)
+        self._thread.start()
+
+    def search(self, query: str, limit: int = 20) -> int:
+        """Queues a query and returns its id, which results_ready reports with the hits."""
+        with self._condition:
+            self._serial += 1
+            self._pending = (self._serial, query, limit)
+            if self._running is not None:
+                self._running.db.interrupt()
+            self._condition.notify()
+            return self._serial
+
+    def close(self):
+        with self._condition:
+            self._stopping = True
+            self._pending = None
+            if self._running is not None:
+                self._running.db.interrupt()
+            self._condition.notify()
+        self._thread.join(timeout=2.0)
+
+    def _run(self):
+        index = PageTextIndex(self.path)
+        try:
+            while True:
+                with self._condition:
+                    while self._pending is None and not self._stopping:
+                        self._condition.wait()
+                    if self._stopping:
+                        return
+                    (serial, query, limit), self._pending = self._pending, None
+                    self._running = index
+                started = time.perf_counter()
+                try:
+                    hits = index.search(query, limit)
+                except sqlite3.OperationalError: # Interrupted by a newer query, or the index is locked
+                    hits = None
+                finally:
+                    with self._condition:
+                        self._running = None
+                if hits is not None:
+                    try:
+                        self.results_ready.emit(serial, hits, (time.perf_counter() - started) * 1000)
+                    except RuntimeError: # The window that owned this searcher is gone
+                        return
+        finally:
+            index.close()
+
+
+class PageTextCollector(QObject):
+    """
+    Extracts the text of finished page loads for indexing. Only one page is
+    extracted per EXTRACT_INTERVAL_MS, and nothing is extracted while the
+    foreground tab is still loading.
+    """
+    def __init__(self, main_window: 'WebBrowserWindow', worker: IndexWorker, parent=None): # type: ignore
+        super().__init__(parent or main_window)
+        self.main_window = main_window
+        self.worker = worker
+        self.pending = {} # view -> time its load finished
+        self.timer = QTimer(self)
+        self.timer.setInterval(EXTRACT_INTERVAL_MS)
+        self.timer.timeout.connect(self.extract_next)
+
+    def watch(self, view: 'QWebEngineView'): # type: ignore
+        view.loadFinished.connect(lambda ok, v=view: self.on_load_finished(ok, v))
+        view.destroyed.connect(lambda _=None, v=view: self.pending.pop(v, None))
+
+    def on_load_finished(self, ok: bool, view):
+        if ok and view.url().scheme() in ("http", "https"):
+            self.pending[view] = time.monotonic()
+            if not self.timer.isActive():
+                self.timer.start()
+
+    def extract_next(self):
+        if not self.pending:
+            self.timer.stop()
+            return
+        foreground = self.main_window.current_browser_view()
+        if foreground is not None and foreground.isLoading():
+            return
+        now = time.monotonic()
+        for view, finished_at in list(self.pending.items()):
+            if view.isLoading(): # A new load is under way; its own loadFinished re-queues it
+                del self.pending[view]
+                continue
+            if now - finished_at < EXTRACT_DELAY_S:
+                continue
+            del self.pending[view]
+            url, title = view.url().toString(), view.title()
+            view.page().toPlainText(lambda text, u=url, t=title: self.worker.submit(u, t, text))
+            return
+
+
+_shared_worker = None
+
+
+def shared_index_worker() -> IndexWorker:
+    """Starts (once) the application-wide index worker writing to the user data directory."""
+    global _shared_worker
+    if _shared_worker is None:
+        from paths import app_data_path
+        _shared_worker = IndexWorker(app_data_path("page_index.sqlite3"))
+        _shared_worker.start()
+        if (app := QCoreApplication.instance()) is not None:
+            app.aboutToQuit.connect(_shared_worker.stop)
+    return _shared_worker
@@ -0,0 +1,28 @@
+# paths.py
+import os
+
+from PyQt6.QtCore import QStandardPaths
+
+_data_dir_override = None
+
+
+def set_app_data_dir(path: str | None):
+    """Redirects app_data_dir() (e.g. to a temporary directory for a benchmark run); None restores the default."""
+    global _data_dir_override
+    _data_dir_override = path
+
+
+def app_data_dir() -> str:
+    """Returns (and creates) the per-user data directory, e.g. ~/.local/share/NaviCodeLabs/Encrypt Browser."""
+    path = _data_dir_override or QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+    if not path: # No writable location (unusual sandboxes); fall back to the working directory
+        path = os.path.abspath("browser_data")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def app_data_path(*parts: str) -> str:
+    """Joins parts onto the data directory, creating intermediate directories."""
+    path = os.path.join(app_data_dir(), *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
@@ -0,0 +1,353 @@
+# predictor.py
+"""
+Predictive preconnect and prerender from the address bar (opt-in).
+
+PredictionModel learns which URL the user commits for each typed prefix. While
+the user types, AddressBarPredictor looks the current text up and, for origins
+on the allowlist:
+
+  * with high confidence, prerenders the URL in a hidden page from a small
+    per-window pool; pressing Enter on that URL swaps the page into the tab;
+  * with moderate confidence, sends a HEAD request to warm DNS and the server.
+
+Every prerender and preconnect is counted as a hit (the user went there) or as
+wasted work, see Predictor.stats(). Private windows never predict or learn.
+"""
+import json
+import os
+import time
+from collections import OrderedDict
+
+from PyQt6.QtCore import QCoreApplication, QObject, QSettings, QTimer, QUrl
+from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt6.QtWebEngineCore import QWebEnginePage
+
+MIN_PREFIX_CHARS = 2
+MAX_PREFIX_CHARS = 24 # Longer input is looked up by its first MAX_PREFIX_CHARS characters
+MAX_PREFIXES = 5000 # Least recently used prefixes are forgotten first
+MAX_PREFIX_COUNT = 64 # Counts are halved past this, so old habits fade
+
+PRERENDER_CONFIDENCE = 0.75
+PRERENDER_MIN_SAMPLES = 3
+PRECONNECT_CONFIDENCE = 0.4
+PRECONNECT_MIN_SAMPLES = 2
+PRECONNECT_TTL_S = 30.0 # A preconnect not followed by a visit within this time is wasted
+
+PRERENDER_POOL_SIZE = 1 # Hidden pages per window
+PREDICT_DELAY_MS = 150 # Debounce while typing
+SAVE_DELAY_MS = 2000
+HEAD_TIMEOUT_MS = 5000
+
+
+def prefix_key(text: str) -> str:
+    """Normalises typed text so 'https://www.Example.com' and 'example.com' share prefixes."""
+    key = text.strip().lower()
+    for scheme in ("https://", "http://"):
+        if key.startswith(scheme):
+            key = key[len(scheme):]
+            break
+    if key.startswith("www."):
+        key = key[4:]
+    return key[:MAX_PREFIX_CHARS]
+
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def origin_of(url: QUrl) -> str:
+    origin = url.adjusted(QUrl.UrlFormattingOption.RemovePath | QUrl.UrlFormattingOption.RemoveQuery
+                          | QUrl.UrlFormattingOption.RemoveFragment | QUrl.UrlFormattingOption.RemoveUserInfo)
+    if origin.port() == DEFAULT_PORTS.get(origin.scheme()): # https://host:443 is https://host
+        origin.setPort(-1)
+    return origin.toString().lower()
+
+
+def parse_origin(text: str) -> str | None:
+    """
+    The origin of an allowlist entry such as 'https://example.com:443' or 'example.com'
+    (entries without a scheme mean https); None if it has none.
+    """
+    text = text.strip()
+    if not text or any(c.isspace() for c in text):
+        return None
+    url = QUrl.fromUserInput(text if "://" in text else "https://" + text)
+    if not url.isValid() or url.scheme() not in DEFAULT_PORTS or not url.host():
+        return None
+    return origin_of(url)
+
+
+def same_target(a: QUrl, b: QUrl) -> bool:
+    options = QUrl.UrlFormattingOption.RemoveFragment
+    return a.adjusted(options).toString().rstrip("/") == b.adjusted(options).toString().rstrip("/")
+
+
+class PredictionModel:
+    """Typed prefix -> {committed URL: count}, persisted as JSON."""
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.prefixes = OrderedDict() # Least recently used first
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.prefixes.update(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable prediction data {path}: {e}")
+
+    def record(self, typed: str, url: str):
+        key = prefix_key(typed)
+        for length in range(MIN_PREFIX_CHARS, len(key) + 1):
+            prefix = key[:length]
+            counts = self.prefixes.pop(prefix, {})
+            counts[url] = counts.get(url, 0) + 1
+            if sum(counts.values()) > MAX_PREFIX_COUNT:
+                counts = {u: c // 2 for u, c in counts.items() if c // 2}
+            self.prefixes[prefix] = counts
+        while len(self.prefixes) > MAX_PREFIXES:
+            self.prefixes.popitem(last=False)
+
+    def predict(self, typed: str) -> tuple[str, float, int] | None:
+        """The most likely URL for the typed text, with its share of past choices and the sample count."""
+        counts = self.prefixes.get(prefix_key(typed))
+        if not counts:
+            return None
+        url, best = max(counts.items(), key=lambda item: item[1])
+        total = sum(counts.values())
+        return url, best / total, total
+
+    def clear(self):
+        self.prefixes.clear()
+
+    def save(self):
+        if not self.path:
+            return
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.prefixes, f, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Could not save prediction data: {e}")
+
+
+class Predictor(QObject):
+    """Shared model, settings, preconnects and hit/waste counters."""
+    def __init__(self, model: PredictionModel, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.settings = QSettings()
+        self.enabled = self.settings.value("predictor/enabled", False, type=bool)
+        self.allowed_origins = {origin for origin in map(parse_origin, self.settings.value("predictor/origins", [], type=list))
+                                if origin}
+        self.network = QNetworkAccessManager(self)
+        self.preconnected = {} # origin -> time of the HEAD request
+        self.counters = dict.fromkeys(("predictions", "prerenders", "prerender_hits", "prerenders_wasted",
+                                       "preconnects", "preconnect_hits", "preconnects_wasted"), 0)
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(SAVE_DELAY_MS)
+        self.save_timer.timeout.connect(self.model.save)
+        if (app := QCoreApplication.instance()) is not None:
+            app.aboutToQuit.connect(self.flush)
+
+    def configure(self, enabled: bool, origins):
+        """Stores the switch and allowlist; entries without an http(s) origin are skipped (and printed)."""
+        self.enabled = enabled
+        self.allowed_origins = set()
+        for entry in filter(None, (o.strip() for o in origins)):
+            if (origin := parse_origin(entry)) is None:
+                print(f"Ignoring predictor allowlist entry {entry!r}: not an http(s) origin")
+            else:
+                self.allowed_origins.add(origin)
+        self.settings.setValue("predictor/enabled", enabled)
+        self.settings.setValue("predictor/origins", sorted(self.allowed_origins))
+
+    def flush(self):
+        if self.save_timer.isActive():
+            self.save_timer.stop()
+            self.model.save()
+
+    def clear(self):
+        """Forgets everything learned (part of clearing browsing data)."""
+        self.save_timer.stop()
+        self.model.clear()
+        self.model.save()
+
+    def allowed(self, url: QUrl) -> bool:
+        return url.scheme() in ("http", "https") and origin_of(url) in self.allowed_origins
+
+    def predict(self, typed: str) -> tuple[QUrl, float, int] | None:
+        if not self.enabled or len(prefix_key(typed)) < MIN_PREFIX_CHARS:
+            return None
+        prediction = self.model.predict(typed)
+        if prediction is None:
+            return None
+        url = QUrl(prediction[0])
+        if not self.allowed(url):
+            return None
+        self.counters["predictions"] += 1
+        return url, prediction[1], prediction[2]
+
+    def commit(self, typed: str, url: QUrl):
+        """Learns from a committed navigation and settles outstanding preconnects."""
+        self.expire_preconnects()
+        if self.preconnected.pop(origin_of(url), None) is not None:
+            self.counters["preconnect_hits"] += 1
+        if self.enabled and url.scheme() in ("http", "https"):
+            self.model.record(typed, url.toString())
+            self.save_timer.start()
+
+    def preconnect(self, url: QUrl):
+        """Warms DNS, TCP/TLS and the server with a HEAD request (no cookies are sent)."""
+        self.expire_preconnects()
+        origin = origin_of(url)
+        if origin in self.preconnected:
+            return
+        self.preconnected[origin] = time.monotonic()
+        self.counters["preconnects"] += 1
+        request = QNetworkRequest(QUrl(origin + "/"))
+        request.setTransferTimeout(HEAD_TIMEOUT_MS)
+        reply = self.network.head(request)
+        reply.finished.connect(reply.deleteLater)
+
+    def expire_preconnects(self):
+        cutoff = time.monotonic() - PRECONNECT_TTL_S
+        for origin, sent_at in list(self.preconnected.items()):
+            if sent_at < cutoff:
+                del self.preconnected[origin]
+                self.counters["preconnects_wasted"] += 1
+
+    def stats(self) -> dict:
+        self.expire_preconnects()
+        prerenders_settled = self.counters["prerender_hits"] + self.counters["prerenders_wasted"]
+        return {
+            "enabled": self.enabled,
+            "allowed_origins": sorted(self.allowed_origins),
+            "learned_prefixes": len(self.model.prefixes),
+            **self.counters,
+            "prerender_hit_rate": round(self.counters["prerender_hits"] / prerenders_settled, 3)
+                                  if prerenders_settled else None,
+        }
+
+    def summary(self) -> str:
+        stats = self.stats()
+        return (f"Prerenders: {stats['prerender_hits']} used, {stats['prerenders_wasted']} wasted. "
+                f"Preconnects: {stats['preconnect_hits']} used, {stats['preconnects_wasted']} wasted.")
+
+
+class _PrerenderSlot:
+    """A hidden page in the pool and the URL it is currently prerendering."""
+    def __init__(self, page: QWebEnginePage):
+        self.page = page
+        self.url = None
+        self.load_ok = None # None while loading
+        page.loadFinished.connect(self.on_load_finished)
+
+    def on_load_finished(self, ok: bool):
+        self.load_ok = ok
+
+
+class PrerenderPool(QObject):
+    """A few hidden, reusable pages. Pages taken by a tab are replaced lazily."""
+    def __init__(self, page_factory, predictor: Predictor, size: int = PRERENDER_POOL_SIZE, parent=None):
+        super().__init__(parent)
+        self.page_factory = page_factory
+        self.predictor = predictor
+        self.size = size
+        self.slots = [] # Least recently used first
+
+    def prerender(self, url: QUrl):
+        for slot in self.slots:
+            if slot.url is not None and same_target(slot.url, url):
+                self.slots.remove(slot)
+                self.slots.append(slot)
+                return
+        if len(self.slots) < self.size:
+            page = self.page_factory()
+            page.setParent(self)
+            page.setAudioMuted(True)
+            slot = _PrerenderSlot(page)
+        else:
+            slot = self.slots.pop(0)
+            self.settle_waste(slot)
+        slot.url, slot.load_ok = url, None
+        self.slots.append(slot)
+        self.predictor.counters["prerenders"] += 1
+        slot.page.setUrl(url)
+
+    def take(self, url: QUrl) -> tuple[QWebEnginePage, bool | None] | None:
+        """Removes and returns the page prerendering `url` with its load result (None while loading)."""
+        for slot in self.slots:
+            if slot.url is not None and same_target(slot.url, url):
+                self.slots.remove(slot)
+                self.predictor.counters["prerender_hits"] += 1
+                slot.page.loadFinished.disconnect(slot.on_load_finished)
+                slot.page.setAudioMuted(False)
+                slot.page.history().clear() # Earlier prerenders in this page are not the tab's history
+                return slot.page, slot.load_ok
+        return None
+
+    def settle_waste(self, slot: _PrerenderSlot):
+        if slot.url is not None:
+            self.predictor.counters["prerenders_wasted"] += 1
+            slot.url = slot.load_ok = None
+            slot.page.triggerAction(QWebEnginePage.WebAction.Stop)
+            slot.page.setUrl(QUrl("about:blank")) # Frees the page's resources but keeps it for reuse
+
+    def discard_unused(self):
+        for slot in self.slots:
+            self.settle_waste(slot)
+
+
+class AddressBarPredictor(QObject):
+    """Watches a window's address bar and drives prerendering and preconnects for it."""
+    def __init__(self, main_window: 'WebBrowserWindow', predictor: Predictor, parent=None): # type: ignore
+        super().__init__(parent or main_window)
+        self.main_window = main_window
+        self.predictor = predictor
+        self.pool = PrerenderPool(main_window.create_page, predictor, parent=self)
+        self.typed = ""
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(PREDICT_DELAY_MS)
+        self.timer.timeout.connect(self.predict)
+        main_window.address_bar.textEdited.connect(self.on_text_edited)
+
+    def on_text_edited(self, text: str):
+        self.typed = text
+        if self.predictor.enabled:
+            self.timer.start()
+
+    def predict(self):
+        prediction = self.predictor.predict(self.typed)
+        if prediction is None:
+            return
+        url, confidence, samples = prediction
+        current_view = self.main_window.current_browser_view()
+        if current_view is not None and same_target(current_view.url(), url):
+            return
+        if confidence >= PRERENDER_CONFIDENCE and samples >= PRERENDER_MIN_SAMPLES:
+            self.pool.prerender(url)
+        elif confidence >= PRECONNECT_CONFIDENCE and samples >= PRECONNECT_MIN_SAMPLES:
+            self.predictor.preconnect(url)
+
+    def commit(self, url: QUrl) -> tuple[QWebEnginePage, bool | None] | None:
+        """Called when the user presses Enter; returns a prerendered page for `url` if there is one."""
+        self.timer.stop()
+        typed, self.typed = self.typed, ""
+        if typed:
+            self.predictor.commit(typed, url)
+        taken = self.pool.take(url)
+        self.pool.discard_unused()
+        return taken
+
+
+_shared_predictor = None
+
+
+def shared_predictor() -> Predictor:
+    """The application-wide predictor, learning into the user data directory."""
+    global _shared_predictor
+    if _shared_predictor is None:
+        from paths import app_data_path
+        _shared_predictor = Predictor(PredictionModel(app_data_path("predictions.json")))
+    return _shared_predictor
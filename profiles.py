@@ -0,0 +1,63 @@
+# profiles.py
+"""
+Browser profiles shared between windows.
+
+Normal windows share the on-disk "SecureUserProfile". Private windows share one
+off-the-record profile that keeps cookies, local storage and its HTTP cache in
+RAM, with the cache capped at PRIVATE_HTTP_CACHE_BYTES. The private profile is
+torn down when the last private window closes, so the next private window
+starts empty.
+"""
+from PyQt6.QtWebEngineCore import QWebEngineProfile
+from PyQt6.QtWidgets import QApplication
+
+DEFAULT_PROFILE_NAME = "SecureUserProfile"
+PRIVATE_HTTP_CACHE_BYTES = 32 * 1024 * 1024
+
+_default_profile = None
+_private_profile = None
+_private_users = 0
+
+
+def default_profile() -> QWebEngineProfile:
+    """The persistent profile used by normal windows."""
+    global _default_profile
+    if _default_profile is None:
+        _default_profile = QWebEngineProfile(DEFAULT_PROFILE_NAME, QApplication.instance())
+    return _default_profile
+
+
+def acquire_private_profile() -> QWebEngineProfile:
+    """Returns the shared off-the-record profile, creating it for the first private window."""
+    global _private_profile, _private_users
+    if _private_profile is None:
+        profile = QWebEngineProfile(QApplication.instance()) # No storage name: off-the-record
+        profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.MemoryHttpCache)
+        profile.setHttpCacheMaximumSize(PRIVATE_HTTP_CACHE_BYTES)
+        profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.NoPersistentCookies)
+        _private_profile = profile
+    _private_users += 1
+    return _private_profile
+
+
+def release_private_profile():
+    """
+    Called by each private window as it closes. When the last one goes, everything
+    the profile holds in memory is cleared and the profile is deleted. The windows'
+    pages must already be scheduled for deletion, which happens before the profile's
+    own deferred deletion.
+    """
+    global _private_profile, _private_users
+    if _private_profile is None:
+        return
+    _private_users = max(0, _private_users - 1)
+    if _private_users == 0:
+        profile, _private_profile = _private_profile, None
+        profile.clearHttpCache()
+        profile.clearAllVisitedLinks()
+        profile.cookieStore().deleteAllCookies()
+        profile.deleteLater()
+
+
+def private_window_count() -> int:
+    return _private_users
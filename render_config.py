@@ -0,0 +1,423 @@
+# render_config.py
+"""
+Rendering configuration: picks the Chromium/Qt rendering backend and flag profile
+applied before QApplication is created.
+
+Every candidate backend is benchmarked in a child process (Chromium flags are
+fixed for the lifetime of a process) against a small synthetic page set. The
+fastest backend that completed every run is stored in the user data directory
+and reused on later launches until the Qt version, machine or candidate list
+changes. On first run the browser uses FALLBACK_BACKEND and starts the probe
+when it quits, in a detached process that waits for the browser to exit, so the
+benchmark neither delays startup nor competes with the user's session.
+`--probe-rendering` runs it in the foreground with progress output. Either way
+it stops after PROBE_BUDGET_S.
+
+Deployments can pin a backend and choose a Chromium flag profile in a JSON file,
+located by ENCRYPT_BROWSER_RENDER_CONFIG or `rendering_profiles.json` next to the
+user data (see DEFAULT_DEPLOYMENT_CONFIG for the format).
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from PyQt6.QtCore import Qt, QT_VERSION_STR
+from PyQt6.QtWidgets import QApplication
+
+# Candidate backends, in order of preference when timings tie. "attributes" are
+# Qt.ApplicationAttribute names set before QApplication is constructed.
+BACKEND_CANDIDATES = {
+    "software-gl": {
+        "env": {"QT_ANGLE_PLATFORM": "warp"},
+        "flags": ["--disable-gpu"],
+        "attributes": ["AA_UseSoftwareOpenGL"],
+    },
+    "swiftshader": {
+        "env": {},
+        "flags": ["--use-gl=angle", "--use-angle=swiftshader", "--enable-unsafe-swiftshader"],
+        "attributes": [],
+    },
+    "software-compositing": {
+        "env": {},
+        "flags": ["--disable-gpu-compositing", "--disable-gpu-rasterization"],
+        "attributes": [],
+    },
+    "gpu": {
+        "env": {},
+        "flags": [],
+        "attributes": [],
+    },
+}
+FALLBACK_BACKEND = "software-gl" # What the browser always used before probing existed
+PROBE_FORMAT_VERSION = 1 # Bump when candidates or the page set change to force a re-probe
+
+BUILTIN_PROFILES = {
+    "default": {"flags": []},
+    "low-memory": {"flags": ["--renderer-process-limit=2", "--process-per-site"]},
+}
+
+DEFAULT_DEPLOYMENT_CONFIG = {
+    "backend": "auto", # "auto" (probe) or one of BACKEND_CANDIDATES
+    "probe": True, # Whether "auto" may run the benchmark at startup
+    "profile": "default", # Name from "profiles" or BUILTIN_PROFILES
+    "profiles": {}, # e.g. {"kiosk": {"flags": ["--renderer-process-limit=2", "--process-per-site"]}}
+}
+
+PROBE_RUNS = 2 # Each candidate must succeed this many times to count as stable
+PROBE_TIMEOUT_S = 20 # Per child process; a healthy run takes a few seconds
+PROBE_PAGE_TIMEOUT_MS = 5_000
+PROBE_BUDGET_S = 90 # Whole probe; candidates not reached in time are skipped
+PROBE_EXIT_WAIT_S = 30 # How long a probe started at quit waits for the browser process to end
+PROBE_FRAMES = 30
+PROBE_RESULT_PREFIX = "RENDER_PROBE_RESULT "
+
+# Synthetic pages covering text layout, compositing-heavy CSS, 2D canvas and a large table
+PROBE_PAGES = {
+    "text": "<html><body style='font:14px serif;columns:3'>" + "<p>" + ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 40) + "</p>" * 60 + "</body></html>",
+    "css": "<html><body style='margin:0'>" + "".join(
+        f"<div style='position:absolute;left:{(i * 37) % 900}px;top:{(i * 53) % 600}px;width:120px;height:80px;"
+        f"border-radius:12px;box-shadow:0 4px 16px rgba(0,0,0,.4);opacity:.85;"
+        f"background:linear-gradient({i * 7}deg,#07f,#f70);animation:spin 2s linear infinite'></div>" for i in range(150)
+    ) + "<style>@keyframes spin{to{transform:rotate(360deg)}}</style></body></html>",
+    "canvas": "<html><body style='margin:0'><canvas id='c' width='1024' height='768'></canvas><script>"
+              "var c=document.getElementById('c').getContext('2d');function draw(t){for(var i=0;i<400;i++){"
+              "c.fillStyle='hsl('+((i*7+t/10)%360)+',80%,50%)';c.beginPath();c.arc((i*53+t/5)%1024,(i*97)%768,20,0,7);c.fill();}"
+              "requestAnimationFrame(draw);}requestAnimationFrame(draw);</script></body></html>",
+    "table": "<html><body><table border='1'>" + "".join(
+        f"<tr>{''.join(f'<td>r{r}c{c}</td>' for c in range(12))}</tr>" for r in range(400)
+    ) + "</table></body></html>",
+}
+
+# Measures PROBE_FRAMES animation frames while scrolling, leaving the mean frame time in window.__probe
+_FRAME_PROBE_JS = """
+(function(){
+  window.__probe = null;
+  var frames = 0, start = performance.now();
+  function step(){
+    window.scrollBy(0, 40);
+    if (++frames < %d) { requestAnimationFrame(step); }
+    else { window.__probe = (performance.now() - start) / frames; }
+  }
+  requestAnimationFrame(step);
+})();
+""" % PROBE_FRAMES
+
+
+def _config_dir() -> str:
+    from paths import app_data_dir
+    return app_data_dir()
+
+
+def probe_cache_path() -> str:
+    return os.path.join(_config_dir(), "rendering_probe.json")
+
+
+def probe_lock_path() -> str:
+    return os.path.join(_config_dir(), "rendering_probe.lock")
+
+
+def deployment_config_path() -> str:
+    return os.environ.get("ENCRYPT_BROWSER_RENDER_CONFIG") or os.path.join(_config_dir(), "rendering_profiles.json")
+
+
+def load_deployment_config() -> dict:
+    config = dict(DEFAULT_DEPLOYMENT_CONFIG)
+    path = deployment_config_path()
+    if os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                loaded = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable rendering config {path}: {e}")
+            return config
+        if not isinstance(loaded, dict):
+            print(f"Ignoring rendering config {path}: expected a JSON object, got {type(loaded).__name__}")
+            return config
+        config.update(loaded)
+    if not isinstance(config.get("backend"), str):
+        print(f"Ignoring 'backend' in rendering config {path}: expected a string")
+        config["backend"] = DEFAULT_DEPLOYMENT_CONFIG["backend"]
+    if not isinstance(config.get("probe"), bool):
+        print(f"Ignoring 'probe' in rendering config {path}: expected true or false")
+        config["probe"] = DEFAULT_DEPLOYMENT_CONFIG["probe"]
+    if not isinstance(config.get("profiles"), dict):
+        print(f"Ignoring 'profiles' in rendering config {path}: expected a JSON object")
+        config["profiles"] = {}
+    return config
+
+
+def profile_flags(config: dict) -> list[str]:
+    name = config.get("profile", "default")
+    profiles = {**BUILTIN_PROFILES, **config.get("profiles", {})}
+    if not isinstance(name, str) or name not in profiles:
+        print(f"Unknown rendering profile {name!r}; using 'default'.")
+        name = "default"
+    profile = profiles[name]
+    flags = profile.get("flags", []) if isinstance(profile, dict) else None
+    if not isinstance(flags, list) or not all(isinstance(flag, str) for flag in flags):
+        print(f"Rendering profile {name!r} needs a 'flags' list of strings; using no extra flags.")
+        return []
+    return list(flags)
+
+
+def machine_fingerprint() -> dict:
+    """Changes in any of these invalidate a stored probe result."""
+    return {
+        "version": PROBE_FORMAT_VERSION,
+        "qt": QT_VERSION_STR,
+        "machine": platform.machine(),
+        "node": platform.node(),
+        "platform": os.environ.get("QT_QPA_PLATFORM", ""),
+    }
+
+
+def load_probe_result() -> dict | None:
+    try:
+        with open(probe_cache_path(), encoding="utf-8") as f:
+            result = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(result, dict) or result.get("fingerprint") != machine_fingerprint() or result.get("backend") not in BACKEND_CANDIDATES:
+        return None
+    return result
+
+
+def apply_backend(name: str, extra_flags: list[str]):
+    """Sets environment variables, Chromium flags and Qt attributes for a backend."""
+    backend = BACKEND_CANDIDATES[name]
+    for key, value in backend["env"].items():
+        os.environ[key] = value
+    # Flags already exported by the user or the deployment's launcher are kept (and win, coming last)
+    user_flags = os.environ.get("QTWEBENGINE_CHROMIUM_FLAGS", "")
+    flags = backend["flags"] + extra_flags + user_flags.split()
+    os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = " ".join(flags)
+    for attribute in backend["attributes"]:
+        QApplication.setAttribute(getattr(Qt.ApplicationAttribute, attribute), True)
+
+
+def configure(force_probe: bool = False) -> str:
+    """
+    Chooses and applies the rendering backend for this process. Must run before
+    QApplication is created. Returns the backend name.
+    """
+    config = load_deployment_config()
+    extra_flags = profile_flags(config)
+    backend = config.get("backend", "auto")
+
+    if backend != "auto":
+        if backend not in BACKEND_CANDIDATES:
+            print(f"Unknown rendering backend {backend!r}; using {FALLBACK_BACKEND}.")
+            backend = FALLBACK_BACKEND
+    elif force_probe:
+        backend = probe_backends(extra_flags)["backend"]
+    elif (result := load_probe_result()) is not None:
+        backend = result["backend"]
+    else:
+        global _pending_probe_flags
+        if config.get("probe", True):
+            _pending_probe_flags = extra_flags
+            print(f"Rendering backends will be benchmarked after the browser quits; using {FALLBACK_BACKEND} until then.")
+        backend = FALLBACK_BACKEND
+
+    apply_backend(backend, extra_flags)
+    return backend
+
+
+_pending_probe_flags = None # Set by configure() when the probe should run once the browser quits
+
+
+def start_pending_probe():
+    """Connected to aboutToQuit: starts the probe configure() deferred, if any."""
+    global _pending_probe_flags
+    if _pending_probe_flags is not None:
+        start_background_probe(_pending_probe_flags, wait_pid=os.getpid())
+        _pending_probe_flags = None
+
+
+def start_background_probe(extra_flags: list[str], wait_pid: int | None = None) -> bool:
+    """
+    Starts the probe in a detached process whose result is used from the next
+    launch on. With `wait_pid` it first waits (up to PROBE_EXIT_WAIT_S) for that
+    process to exit. Returns False if one is already running (per its lock file).
+    """
+    lock = probe_lock_path()
+    try:
+        if time.time() - os.path.getmtime(lock) < PROBE_EXIT_WAIT_S + PROBE_BUDGET_S + PROBE_TIMEOUT_S:
+            return False
+    except OSError:
+        pass # No lock
+    command = [sys.executable, os.path.abspath(__file__), "--probe", "--flags", json.dumps(extra_flags),
+               "--cache", probe_cache_path(), "--lock", lock]
+    if wait_pid is not None:
+        command += ["--wait-pid", str(wait_pid)]
+    try:
+        with open(lock, "w", encoding="utf-8") as f:
+            f.write(str(os.getpid()))
+        subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         start_new_session=(os.name == "posix"))
+    except OSError as e:
+        print(f"Could not start the rendering probe: {e}")
+        return False
+    print("Probing rendering backends in the background; the result applies from the next launch.")
+    return True
+
+
+def _wait_for_exit(pid: int, timeout: float = PROBE_EXIT_WAIT_S):
+    if os.name != "posix": # os.kill(pid, 0) would terminate the process on Windows
+        time.sleep(min(timeout, 5.0))
+        return
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return
+        except OSError:
+            pass # Exists but not ours to signal; keep waiting
+        time.sleep(0.25)
+
+
+def probe_backends(extra_flags: list[str], cache_path: str | None = None, budget_s: float = PROBE_BUDGET_S) -> dict:
+    """Benchmarks every candidate in child processes and stores the fastest stable one."""
+    print(f"Probing {len(BACKEND_CANDIDATES)} rendering backends (up to {budget_s:g}s)...", flush=True)
+    deadline = time.monotonic() + budget_s
+    scores = {}
+    for position, name in enumerate(BACKEND_CANDIDATES, 1):
+        print(f"  [{position}/{len(BACKEND_CANDIDATES)}] {name:<22}", end=" ", flush=True)
+        timings = []
+        for _ in range(PROBE_RUNS):
+            remaining = deadline - time.monotonic()
+            if remaining <= 1:
+                break
+            score = _run_probe_child(name, extra_flags, min(PROBE_TIMEOUT_S, remaining))
+            if score is None:
+                break
+            timings.append(score)
+        if len(timings) == PROBE_RUNS:
+            scores[name] = min(timings)
+            print(f"{scores[name]:8.1f} ms", flush=True)
+        elif time.monotonic() >= deadline - 1:
+            print("out of time, skipped", flush=True)
+        else:
+            print("unstable, skipped", flush=True)
+
+    if not scores:
+        # Stored as well, so a machine where nothing passes does not re-probe on every launch
+        print(f"No rendering backend passed the probe; using {FALLBACK_BACKEND}.")
+    result = {
+        "backend": min(scores, key=scores.get) if scores else FALLBACK_BACKEND,
+        "scores_ms": scores,
+        "probed_at": time.time(),
+        "fingerprint": machine_fingerprint(),
+    }
+    try:
+        with open(cache_path or probe_cache_path(), "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    except OSError as e:
+        print(f"Could not store rendering probe result: {e}")
+    print(f"Selected rendering backend: {result['backend']}")
+    return result
+
+
+def _run_probe_child(name: str, extra_flags: list[str], timeout: float = PROBE_TIMEOUT_S) -> float | None:
+    command = [sys.executable, os.path.abspath(__file__), "--bench", name, "--flags", json.dumps(extra_flags)]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None
+    if completed.returncode != 0:
+        return None
+    for line in completed.stdout.splitlines():
+        if line.startswith(PROBE_RESULT_PREFIX):
+            return json.loads(line[len(PROBE_RESULT_PREFIX):]).get("total_ms")
+    return None
+
+
+def run_benchmark(name: str, extra_flags: list[str]) -> int:
+    """Child-process side of the probe: renders PROBE_PAGES and prints the timings."""
+    from PyQt6.QtCore import QEventLoop, QTimer
+    from PyQt6.QtWebEngineWidgets import QWebEngineView
+
+    apply_backend(name, extra_flags)
+    app = QApplication(sys.argv[:1])
+    view = QWebEngineView()
+    view.setAttribute(Qt.WidgetAttribute.WA_DontShowOnScreen, True)
+    view.resize(1024, 768)
+    view.show()
+
+    def wait(signal_or_none, timeout_ms: int, poll=None) -> bool:
+        """Runs the event loop until a signal fires or poll() is true; False on timeout."""
+        loop = QEventLoop()
+        timer = QTimer()
+        timer.setSingleShot(True)
+        timer.timeout.connect(loop.quit)
+        timer.start(timeout_ms)
+        if signal_or_none is not None:
+            signal_or_none.connect(loop.quit)
+        if poll is not None:
+            poll_timer = QTimer()
+            poll_timer.timeout.connect(lambda: poll() and loop.quit())
+            poll_timer.start(10)
+        loop.exec()
+        finished = timer.isActive()
+        timer.stop()
+        return finished
+
+    pages = {}
+    for page_name, html in PROBE_PAGES.items():
+        started = time.perf_counter()
+        view.setHtml(html)
+        if not wait(view.loadFinished, PROBE_PAGE_TIMEOUT_MS):
+            return 1
+        load_ms = (time.perf_counter() - started) * 1000
+
+        frame_ms = []
+        view.page().runJavaScript(_FRAME_PROBE_JS)
+        def poll_frames():
+            view.page().runJavaScript("window.__probe", lambda value: value and frame_ms.append(value))
+            return bool(frame_ms)
+        if not wait(None, PROBE_PAGE_TIMEOUT_MS, poll_frames):
+            return 1
+
+        grab_started = time.perf_counter()
+        if view.grab().isNull():
+            return 1
+        grab_ms = (time.perf_counter() - grab_started) * 1000
+        pages[page_name] = {"load_ms": load_ms, "frame_ms": frame_ms[0], "grab_ms": grab_ms}
+
+    # Weight frame time by the number of frames so animation smoothness dominates
+    total = sum(p["load_ms"] + p["frame_ms"] * PROBE_FRAMES + p["grab_ms"] for p in pages.values())
+    print(PROBE_RESULT_PREFIX + json.dumps({"backend": name, "total_ms": total, "pages": pages}), flush=True)
+    view.close()
+    app.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Rendering backend probe (normally started by the browser itself)")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--bench", choices=sorted(BACKEND_CANDIDATES), help="Benchmark one backend")
+    mode.add_argument("--probe", action="store_true", help="Benchmark every backend and store the result")
+    parser.add_argument("--flags", default="[]", help="JSON list of extra Chromium flags")
+    parser.add_argument("--cache", help="Where --probe stores its result")
+    parser.add_argument("--lock", help="Lock file --probe removes when done")
+    parser.add_argument("--wait-pid", type=int, help="Process --probe waits for to exit before benchmarking")
+    args = parser.parse_args()
+    if args.bench:
+        sys.exit(run_benchmark(args.bench, json.loads(args.flags)))
+    if not args.cache:
+        parser.error("--probe needs --cache")
+    try:
+        if args.wait_pid:
+            _wait_for_exit(args.wait_pid)
+        probe_backends(json.loads(args.flags), cache_path=args.cache)
+    finally:
+        if args.lock:
+            try:
+                os.remove(args.lock)
+            except OSError:
+                pass
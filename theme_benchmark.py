@@ -0,0 +1,318 @@
+# theme_benchmark.py
+"""
+Benchmarks window and dialog construction and theme switching.
+
+    python theme_benchmark.py [--iterations 20] [--tabs 5] [--legacy] [-platform offscreen]
+
+Construction is timed up to the first shown frame (show() plus processed events),
+which is where styles are polished. Theme switches alternate light and dark with
+`--tabs` tabs open. `--legacy` measures the previous approach for comparison:
+the original window-wide stylesheet (BASELINE_STYLESHEET, as it shipped in
+constants.py) on the platform's default style, with no theme manager involved.
+That version had no dark theme, so legacy switches swap in a copy of the sheet
+with its colors mapped to the dark palette.
+Windows open about:blank. The page index, favicon store, predictor, QSettings
+and the web profile's storage live in a temporary directory for the run, so the
+user's browsing data is neither read nor changed and no pages are fetched.
+Unrecognised arguments (such as -platform offscreen) are passed to Qt.
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from PyQt6.QtCore import QSettings, QUrl
+from PyQt6.QtWidgets import QApplication
+
+
+# The window-wide stylesheet that constants.py applied to every window before themes.py, verbatim
+BASELINE_STYLESHEET = """
+QMainWindow { 
+    background-color: #e8e8e8; /* Unified header color for the entire window background */
+}
+
+QToolBar#TopToolBar {
+    background-color: #e8e8e8; /* Match QMainWindow for unified header */
+    border: none; 
+    padding: 2px 5px 0px 5px; /* No bottom padding, to merge with QTabBar */
+    spacing: 3px; 
+    min-height: 26px; 
+}
+
+QTabWidget {
+    border: none; /* Remove QTabWidget's own border */
+    background-color: transparent; /* Make QTabWidget itself transparent */
+}
+
+QTabWidget::pane { 
+    border-top: 1px solid #b0b0b0; /* Separator line below the unified header (tabs) */
+    background-color: #f6f6f6; /* Main content background */
+}
+
+QTabBar { 
+    background-color: #e8e8e8; /* Match TopToolBar and QMainWindow */
+    border: none; /* No border for QTabBar itself */
+    qproperty-drawBase: 0; 
+    margin: 0px; 
+    padding: 0px 5px 0px 5px; /* No bottom padding for QTabBar */
+}
+
+QTabBar::tab {
+    background-color: #dcdcdc; 
+    color: #4c4c4c;
+    border: 1px solid #c0c0c0; 
+    border-bottom: none; /* Non-selected tabs don't have a distinct bottom border here */
+    border-top-left-radius: 5px;
+    border-top-right-radius: 5px;
+    padding: 5px 10px; 
+    margin-right: 1px; 
+    margin-left: 1px;
+    margin-top: 3px; /* Creates a small space above non-selected tabs */
+    min-width: 80px; 
+    max-width: 160px; 
+    font-size: 12px;
+}
+
+QTabBar::tab:selected {
+    background-color: #f6f6f6; /* Match pane background */
+    color: #2c2c2c; 
+    border-top: 1px solid #b0b0b0; /* Match pane's top border color */
+    border-left: 1px solid #b0b0b0;
+    border-right: 1px solid #b0b0b0;
+    border-bottom-color: #f6f6f6; /* Make bottom border same as pane to "connect" */
+    margin-top: 0px; /* Selected tab is flush with the top of QTabBar area */
+    margin-bottom: -1px; /* Crucial: Pulls selected tab down to cover QTabBar's bottom border line */
+    padding-top: 6px; 
+    padding-bottom: 6px; 
+}
+
+QTabBar::tab:hover:!selected {
+    background-color: #d0d0d0;
+}
+
+QTabBar::tab:first { margin-left: 0; }
+QTabBar::tab:last { margin-right: 0; }
+QTabBar::tab:only-one { margin: 0; }
+
+QTabBar::close-button { 
+    margin: 2px; padding: 1px; border-radius: 3px; 
+}
+QTabBar::close-button:hover { background-color: #c0c0c0; }
+
+
+/* Bottom Toolbar and Address Bar */
+QToolBar#BottomToolBar { 
+    background-color: #f0f0f0; border-top: 1px solid #d0d0d0; 
+    padding: 3px 8px; spacing: 6px; min-height: 28px; 
+}
+QLineEdit#AddressBar {
+    background-color: #ffffff; color: #222222; border: 1px solid #c6c6c6; 
+    border-radius: 6px; padding: 4px 10px; font-size: 13px; min-height: 22px; 
+}
+QLineEdit#AddressBar:focus { border: 1px solid #007aff; }
+
+/* Status Bar */
+QStatusBar {
+    background-color: #f0f0f0; color: #4c4c4c; font-size: 11px; 
+    padding: 2px 0px; border-top: 1px solid #d0d0d0; min-height: 18px; 
+}
+QStatusBar::item { border: none; }
+
+/* Web View */
+QWebEngineView { border: none; background-color: #ffffff; }
+
+
+/* Dialog Styling (remains largely the same) */
+QDialog { background-color: #f6f6f6; border: 1px solid #c0c0c0; }
+QDialog QLabel { font-size: 13px; color: #333333; margin-bottom: 3px;}
+QDialog QLabel#DialogSectionLabel { font-weight: bold; margin-top: 10px; margin-bottom: 6px; }
+QDialog QLabel#InfoLabel { font-size: 11px; color: #555555; margin-top: 2px; margin-bottom: 8px; font-style: italic; }
+QDialog QGroupBox { 
+    font-size: 13px; font-weight: bold; color: #333333; 
+    border: 1px solid #c6c6c6; border-radius: 5px; 
+    margin-top: 10px; padding: 10px 5px 5px 5px;
+}
+QDialog QGroupBox::title {
+    subcontrol-origin: margin; subcontrol-position: top left;
+    padding: 0 3px; left: 7px; 
+}
+QDialog QLineEdit {
+    background-color: #ffffff; color: #222222; border: 1px solid #c6c6c6;
+    border-radius: 5px; padding: 6px 8px; font-size: 13px; min-height: 26px;
+}
+QDialog QLineEdit:focus { border: 1px solid #007aff; }
+QDialog QCheckBox { 
+    font-size: 13px; color: #333333; spacing: 5px; 
+    margin-top: 4px; margin-bottom: 4px; padding-left: 3px;
+}
+QDialog QCheckBox::indicator { width: 15px; height: 15px; }
+QDialog QCheckBox::indicator:unchecked {
+    border: 1px solid #999999; border-radius: 3px; background-color: white;
+}
+QDialog QCheckBox::indicator:checked {
+    background-color: #007aff; border: 1px solid #007aff; border-radius: 3px;
+}
+QDialog QCheckBox::indicator:disabled {
+    border: 1px solid #c0c0c0; background-color: #e0e0e0;
+}
+QDialog QPushButton {
+    background-color: #ffffff; border: 1px solid #c6c6c6; border-radius: 5px;
+    padding: 6px 12px; font-size: 13px; color: #333333; min-height: 26px;
+}
+QDialog QPushButton:hover { background-color: #f0f0f0; }
+QDialog QPushButton:pressed { background-color: #e0e0e0; }
+QDialog QPushButton#ClearDataButton { 
+    background-color: #ffebee; border-color: #ffcdd2;
+}
+QDialog QPushButton#ClearDataButton:hover { background-color: #ffcdd2; }
+QDialog QPushButton:default {
+    background-color: #007aff; color: white; border: 1px solid #007aff;
+}
+QDialog QPushButton:default:hover { background-color: #005ecb; }
+
+/* Splash Screen Styling */
+QSplashScreen {
+    border: 2px solid #007aff; background-color: #e8f0fe; 
+}
+QSplashScreen QLabel { color: #005ecb; font-size: 20px; padding: 10px; }
+"""
+
+
+def legacy_stylesheet(name: str) -> str:
+    """BASELINE_STYLESHEET, with each light theme color it uses replaced by its dark counterpart for "dark"."""
+    if name == "light":
+        return BASELINE_STYLESHEET
+    from themes import LIGHT, DARK
+    mapping = {}
+    for key, light in LIGHT.items():
+        mapping.setdefault(light.lower(), DARK[key])
+    return re.sub(r"#[0-9a-fA-F]{6}\b", lambda m: mapping.get(m.group(0).lower(), m.group(0)), BASELINE_STYLESHEET)
+
+
+def summarize(samples_ms: list[float]) -> dict:
+    ordered = sorted(samples_ms)
+    return {
+        "mean_ms": round(statistics.fmean(ordered), 2),
+        "median_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        "max_ms": round(ordered[-1], 2),
+    }
+
+
+def timed(app: QApplication, build) -> tuple[float, object]:
+    started = time.perf_counter()
+    widget = build()
+    widget.show()
+    app.processEvents()
+    return (time.perf_counter() - started) * 1000, widget
+
+
+def dispose(app: QApplication, widget):
+    widget.close()
+    widget.deleteLater()
+    app.processEvents()
+
+
+def run(app: QApplication, iterations: int, tabs: int, legacy: bool) -> dict:
+    from browser_window import WebBrowserWindow
+    from dialogs import SettingsDialog, SecurityDialog
+    from themes import shared_theme_manager, MODES
+
+    theme = shared_theme_manager()
+    blank = QUrl("about:blank")
+    if legacy:
+        theme.style = lambda widget, role: None # Windows and dialogs get no per-widget QSS, as before themes.py
+
+    def new_window():
+        window = WebBrowserWindow(home_url=blank)
+        if legacy:
+            window.setStyleSheet(BASELINE_STYLESHEET)
+        return window
+
+    window_ms, settings_ms, security_ms = [], [], []
+    for _ in range(iterations):
+        elapsed, window = timed(app, new_window)
+        window_ms.append(elapsed)
+        elapsed, dialog = timed(app, lambda: SettingsDialog(window.default_url.toString(), window,
+                                                             predictor=window.predictor, theme_mode=theme.mode,
+                                                             theme_modes=MODES))
+        settings_ms.append(elapsed)
+        dispose(app, dialog)
+        elapsed, dialog = timed(app, lambda: SecurityDialog(window.current_browser_view(), window.profile, window,
+                                                             data_saver_policy=window.data_saver.policy))
+        security_ms.append(elapsed)
+        dispose(app, dialog)
+        dispose(app, window)
+
+    window = new_window()
+    window.show()
+    for _ in range(tabs - 1):
+        window.add_new_tab(blank, make_current=False)
+    app.processEvents()
+    switch_ms = []
+    for index in range(iterations):
+        name = "dark" if index % 2 == 0 else "light"
+        started = time.perf_counter()
+        if legacy:
+            window.setStyleSheet(legacy_stylesheet(name))
+        else:
+            theme.apply(name)
+        window.repaint()
+        app.processEvents()
+        switch_ms.append((time.perf_counter() - started) * 1000)
+    if not legacy:
+        theme.apply(theme.resolve(), force=True)
+    dispose(app, window)
+
+    return {
+        "mode": "baseline window stylesheet" if legacy else "palette + scoped QSS",
+        "iterations": iterations,
+        "tabs": tabs,
+        "window_construction": summarize(window_ms),
+        "settings_dialog_construction": summarize(settings_ms),
+        "security_dialog_construction": summarize(security_ms),
+        "theme_switch": summarize(switch_ms),
+    }
+
+
+def main(argv=None):
+    argv = sys.argv if argv is None else argv
+    parser = argparse.ArgumentParser(description="Encrypt Browser theme benchmark")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--tabs", type=int, default=5, help="Tabs open while switching themes")
+    parser.add_argument("--legacy", action="store_true", help="Measure the original window-wide stylesheet instead")
+    args, qt_args = parser.parse_known_args(argv[1:])
+
+    from app import configure_rendering_environment
+    configure_rendering_environment() # Reads the stored probe result, so windows render as in the browser
+
+    # Everything the windows store goes to a scratch directory, never the user's profile
+    import paths
+    data_dir = tempfile.mkdtemp(prefix="encrypt-browser-theme-benchmark-")
+    paths.set_app_data_dir(data_dir)
+    QSettings.setDefaultFormat(QSettings.Format.IniFormat)
+    QSettings.setPath(QSettings.Format.IniFormat, QSettings.Scope.UserScope, data_dir)
+
+    app = QApplication(argv[:1] + qt_args)
+    from profiles import default_profile
+    profile = default_profile() # Created before any window, so no page ever opens the user's cookies or cache
+    profile.setPersistentStoragePath(os.path.join(data_dir, "profile"))
+    profile.setCachePath(os.path.join(data_dir, "cache"))
+    try:
+        if not args.legacy: # The baseline used the platform style and palette
+            from themes import shared_theme_manager
+            shared_theme_manager().install(app)
+        print(json.dumps(run(app, max(1, args.iterations), max(1, args.tabs), args.legacy), indent=2))
+    finally:
+        from page_index import shared_index_worker
+        shared_index_worker().stop()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
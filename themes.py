@@ -0,0 +1,234 @@
+# themes.py
+"""
+Light and dark themes built from parameterized palettes.
+
+Each theme is a set of named colors. compile_theme() turns one into a QPalette
+(which the Fusion style uses to draw almost every widget) plus a few small QSS
+rules for the widgets whose look a palette cannot express: the unified header
+with rounded tabs, the address bar, the status bar and some dialog accents.
+Compiled themes are cached, so a switch only installs the application palette
+and re-applies those few rules to the widgets registered with style(). Nothing
+else is re-polished, and no stylesheet is set on windows or dialogs as a whole.
+
+The mode ("system", "light" or "dark") is stored in QSettings. In "system" mode
+the theme follows the platform color scheme (Qt 6.5+) as it changes.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from string import Template
+
+from PyQt6.QtCore import QObject, QSettings, Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QGuiApplication, QPalette
+from PyQt6.QtWidgets import QApplication, QStyleFactory, QWidget
+
+MODES = ("system", "light", "dark")
+
+LIGHT = {
+    # Palette roles
+    "window": "#f0f0f0", "window_text": "#333333", "base": "#ffffff", "alternate_base": "#f6f6f6",
+    "text": "#222222", "button": "#ffffff", "button_text": "#333333", "accent": "#007aff",
+    "accent_text": "#ffffff", "border": "#c6c6c6", "shadow": "#b0b0b0", "light": "#ffffff",
+    "placeholder": "#8a8a8a", "disabled_text": "#a0a0a0", "tooltip": "#ffffe0", "tooltip_text": "#222222",
+    # QSS-only colors
+    "header": "#e8e8e8", "tab": "#dcdcdc", "tab_hover": "#d0d0d0", "tab_text": "#4c4c4c",
+    "tab_border": "#c0c0c0", "tab_selected": "#f6f6f6", "tab_selected_text": "#2c2c2c",
+    "separator": "#b0b0b0", "chrome": "#f0f0f0", "chrome_border": "#d0d0d0", "close_hover": "#c0c0c0",
+    "muted_text": "#555555", "accent_pressed": "#005ecb", "danger_background": "#ffebee",
+    "danger_border": "#ffcdd2", "splash_background": "#e8f0fe",
+}
+
+DARK = {
+    "window": "#2b2b2d", "window_text": "#e6e6e6", "base": "#1e1e1f", "alternate_base": "#262628",
+    "text": "#f0f0f0", "button": "#3a3a3c", "button_text": "#e6e6e6", "accent": "#0a84ff",
+    "accent_text": "#ffffff", "border": "#4a4a4c", "shadow": "#141415", "light": "#505052",
+    "placeholder": "#8e8e93", "disabled_text": "#6e6e73", "tooltip": "#3a3a3c", "tooltip_text": "#f0f0f0",
+    "header": "#323234", "tab": "#3a3a3c", "tab_hover": "#444446", "tab_text": "#b8b8bc",
+    "tab_border": "#4a4a4c", "tab_selected": "#1e1e1f", "tab_selected_text": "#f2f2f2",
+    "separator": "#48484a", "chrome": "#2b2b2d", "chrome_border": "#3a3a3c", "close_hover": "#555558",
+    "muted_text": "#a0a0a5", "accent_pressed": "#0060df", "danger_background": "#4a2326",
+    "danger_border": "#7a2e33", "splash_background": "#1c2a3f",
+}
+
+THEMES = {"light": LIGHT, "dark": DARK}
+
+# QSS kept per widget role; $names are theme colors
+RULES = {
+    "top_toolbar": """
+QToolBar#TopToolBar {
+    background-color: $header; border: none;
+    padding: 2px 5px 0px 5px; spacing: 3px; min-height: 26px;
+}""",
+    "tab_bar": """
+QTabBar {
+    background-color: $header; border: none; qproperty-drawBase: 0;
+    margin: 0px; padding: 0px 5px 0px 5px;
+}
+QTabBar::tab {
+    background-color: $tab; color: $tab_text;
+    border: 1px solid $tab_border; border-bottom: none;
+    border-top-left-radius: 5px; border-top-right-radius: 5px;
+    padding: 5px 10px; margin-right: 1px; margin-left: 1px; margin-top: 3px;
+    min-width: 80px; max-width: 160px; font-size: 12px;
+}
+QTabBar::tab:selected {
+    background-color: $tab_selected; color: $tab_selected_text;
+    border-top: 1px solid $separator; border-left: 1px solid $separator; border-right: 1px solid $separator;
+    border-bottom-color: $tab_selected;
+    margin-top: 0px; margin-bottom: -1px; padding-top: 6px; padding-bottom: 6px;
+}
+QTabBar::tab:hover:!selected { background-color: $tab_hover; }
+QTabBar::tab:first { margin-left: 0; }
+QTabBar::tab:last { margin-right: 0; }
+QTabBar::tab:only-one { margin: 0; }
+QTabBar::close-button { margin: 2px; padding: 1px; border-radius: 3px; }
+QTabBar::close-button:hover { background-color: $close_hover; }""",
+    "bottom_toolbar": """
+QToolBar#BottomToolBar {
+    background-color: $chrome; border-top: 1px solid $chrome_border;
+    padding: 3px 8px; spacing: 6px; min-height: 28px;
+}
+QLineEdit#AddressBar {
+    background-color: $base; color: $text; border: 1px solid $border;
+    border-radius: 6px; padding: 4px 10px; font-size: 13px; min-height: 22px;
+}
+QLineEdit#AddressBar:focus { border: 1px solid $accent; }""",
+    "status_bar": """
+QStatusBar {
+    background-color: $chrome; color: $muted_text; font-size: 11px;
+    padding: 2px 0px; border-top: 1px solid $chrome_border; min-height: 18px;
+}
+QStatusBar::item { border: none; }""",
+    "info_label": """
+QLabel { font-size: 11px; color: $muted_text; margin-top: 2px; margin-bottom: 8px; font-style: italic; }""",
+    "danger_button": """
+QPushButton {
+    background-color: $danger_background; color: $button_text; border: 1px solid $danger_border;
+    border-radius: 5px; padding: 6px 12px; min-height: 26px;
+}
+QPushButton:hover { background-color: $danger_border; }""",
+}
+
+# Dialog children styled by object name
+DIALOG_ROLES = {"InfoLabel": "info_label", "ClearDataButton": "danger_button"}
+
+
+@dataclass(frozen=True)
+class CompiledTheme:
+    name: str
+    colors: dict
+    palette: QPalette
+    rules: dict
+
+
+def build_palette(colors: dict) -> QPalette:
+    role = QPalette.ColorRole
+    palette = QPalette()
+    for palette_role, name in ((role.Window, "window"), (role.WindowText, "window_text"), (role.Base, "base"),
+                               (role.AlternateBase, "alternate_base"), (role.Text, "text"),
+                               (role.Button, "button"), (role.ButtonText, "button_text"),
+                               (role.Highlight, "accent"), (role.HighlightedText, "accent_text"),
+                               (role.Link, "accent"), (role.Mid, "border"), (role.Dark, "shadow"),
+                               (role.Shadow, "shadow"), (role.Light, "light"), (role.Midlight, "border"),
+                               (role.PlaceholderText, "placeholder"), (role.ToolTipBase, "tooltip"),
+                               (role.ToolTipText, "tooltip_text"), (role.BrightText, "accent_text")):
+        palette.setColor(palette_role, QColor(colors[name]))
+    disabled = QPalette.ColorGroup.Disabled
+    for palette_role in (role.WindowText, role.Text, role.ButtonText):
+        palette.setColor(disabled, palette_role, QColor(colors["disabled_text"]))
+    return palette
+
+
+@lru_cache(maxsize=None)
+def compile_theme(name: str) -> CompiledTheme:
+    colors = THEMES[name]
+    rules = {role: Template(rule).substitute(colors) for role, rule in RULES.items()}
+    return CompiledTheme(name, colors, build_palette(colors), rules)
+
+
+def system_prefers_dark() -> bool:
+    hints = QGuiApplication.styleHints()
+    if hints is not None and hasattr(hints, 'colorScheme'): # Qt 6.5+
+        return hints.colorScheme() == Qt.ColorScheme.Dark
+    return False
+
+
+class ThemeManager(QObject):
+    """Applies the current theme to the application and to the widgets registered with style()."""
+    theme_changed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.settings = QSettings()
+        self.mode = self.settings.value("theme/mode", "system", type=str)
+        if self.mode not in MODES:
+            self.mode = "system"
+        self.current = None
+        self.styled = {} # id(widget) -> (widget, role)
+
+    def install(self, app: QApplication):
+        """Switches the app to the palette-driven Fusion style and applies the theme."""
+        if (fusion := QStyleFactory.create("Fusion")) is not None:
+            app.setStyle(fusion)
+        hints = app.styleHints()
+        if hasattr(hints, 'colorSchemeChanged'): # Qt 6.5+
+            hints.colorSchemeChanged.connect(self.on_system_scheme_changed)
+        self.apply(self.resolve())
+
+    def resolve(self) -> str:
+        if self.mode == "system":
+            return "dark" if system_prefers_dark() else "light"
+        return self.mode
+
+    def set_mode(self, mode: str):
+        if mode not in MODES:
+            raise ValueError(f"Unknown theme mode {mode!r}")
+        self.mode = mode
+        self.settings.setValue("theme/mode", mode)
+        self.apply(self.resolve())
+
+    def on_system_scheme_changed(self, _scheme=None):
+        if self.mode == "system":
+            self.apply(self.resolve())
+
+    def apply(self, name: str, force: bool = False):
+        if name == self.current and not force:
+            return
+        compiled = compile_theme(name)
+        self.current = name
+        QApplication.setPalette(compiled.palette)
+        parents = {}
+        for widget, role in list(self.styled.values()):
+            widget.setStyleSheet(compiled.rules[role])
+            if (parent := widget.parentWidget()) is not None and id(parent) not in self.styled:
+                parents[id(parent)] = parent
+        # A styled child (notably a QTabBar) stops its parent from following application palette changes
+        for parent in parents.values():
+            parent.setPalette(compiled.palette)
+        self.theme_changed.emit(name)
+
+    def style(self, widget: QWidget, role: str):
+        """Gives `widget` the QSS of `role` now and after every theme switch."""
+        key = id(widget)
+        if key not in self.styled:
+            widget.destroyed.connect(lambda _=None, key=key: self.styled.pop(key, None))
+        self.styled[key] = (widget, role)
+        widget.setStyleSheet(compile_theme(self.current or self.resolve()).rules[role])
+
+    def style_dialog(self, dialog: QWidget):
+        """Styles a dialog's accent widgets (found by object name); the rest of it follows the palette."""
+        for widget in dialog.findChildren(QWidget):
+            if (role := DIALOG_ROLES.get(widget.objectName())) is not None:
+                self.style(widget, role)
+
+    def color(self, name: str) -> QColor:
+        return QColor(compile_theme(self.current or self.resolve()).colors[name])
+
+
+_shared_theme_manager = None
+
+
+def shared_theme_manager() -> ThemeManager:
+    global _shared_theme_manager
+    if _shared_theme_manager is None:
+        _shared_theme_manager = ThemeManager()
+    return _shared_theme_manager
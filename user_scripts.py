@@ -0,0 +1,270 @@
+# user_scripts.py
+"""
+Greasemonkey-style user scripts.
+
+Scripts are `*.user.js` files in the `userscripts` folder of the user data directory,
+with a metadata block such as:
+
+    // ==UserScript==
+    // @name     Fix intranet header
+    // @match    https://*.intranet.example/*
+    // @exclude  https://*.intranet.example/admin/*
+    // @run-at   document-end
+    // ==/UserScript==
+
+@match (Chrome match patterns), @include/@exclude (globs, or /regex/) and @run-at
+(document-start, document-end, document-idle) are supported; GM_* APIs are not.
+All rules are compiled once into a host index, so a navigation only tests the rules
+filed under its host, its parent domains and the host-independent bucket. Only the
+matching scripts are registered in the page's script collection for that navigation.
+"""
+import glob
+import os
+import re
+import time
+from dataclasses import dataclass, field
+
+from PyQt6.QtCore import QObject, QUrl
+from PyQt6.QtWebEngineCore import QWebEngineScript, QWebEnginePage
+
+SCRIPT_NAME_PREFIX = "userscript:"
+
+RUN_AT = {
+    "document-start": QWebEngineScript.InjectionPoint.DocumentCreation,
+    "document-end": QWebEngineScript.InjectionPoint.DocumentReady,
+    "document-idle": QWebEngineScript.InjectionPoint.Deferred,
+}
+
+_METADATA_RE = re.compile(r"//\s*==UserScript==(.*?)//\s*==/UserScript==", re.DOTALL)
+_METADATA_LINE_RE = re.compile(r"^\s*//\s*@(\S+)(?:\s+(.*?))?\s*$", re.MULTILINE)
+_MATCH_PATTERN_RE = re.compile(r"^(\*|https?|file|ftp|wss?)://(\*|\*\.[^/*]+|[^/*]+)?(/.*)$")
+
+
+def _glob_to_regex(pattern: str) -> re.Pattern:
+    return re.compile("^" + ".*".join(re.escape(part) for part in pattern.split("*")) + "$", re.IGNORECASE)
+
+
+@dataclass
+class UrlRule:
+    """One compiled @match/@include/@exclude rule. `host_key` says where it is filed in the index."""
+    regex: re.Pattern
+    host_key: tuple[str, str] | None # ("exact", host), ("suffix", domain) or None for any host
+
+    def matches(self, url: str) -> bool:
+        return self.regex.match(url) is not None
+
+
+def compile_match_pattern(pattern: str) -> UrlRule | None:
+    """Compiles a Chrome-style match pattern (scheme://host/path) into a rule."""
+    if pattern == "<all_urls>":
+        return UrlRule(re.compile(r"^(https?|file|ftp|wss?)://"), None)
+    parsed = _MATCH_PATTERN_RE.match(pattern)
+    if not parsed:
+        return None
+    scheme, host, path = parsed.groups()
+    host = (host or "").lower()
+    scheme_re = "https?" if scheme == "*" else re.escape(scheme)
+    if host in ("", "*"):
+        host_re, host_key = "[^/]*", None
+    elif host.startswith("*."):
+        domain = host[2:]
+        host_re, host_key = r"(?:[^/]*\.)?" + re.escape(domain), ("suffix", domain)
+    else:
+        host_re, host_key = re.escape(host), ("exact", host)
+    path_re = ".*".join(re.escape(part) for part in path.split("*"))
+    # Ports are ignored by match patterns, as in Chrome
+    return UrlRule(re.compile(f"^{scheme_re}://{host_re}(?::\\d+)?{path_re}$", re.IGNORECASE), host_key)
+
+
+def compile_include(pattern: str) -> UrlRule:
+    """Compiles a Greasemonkey @include/@exclude glob (or /regex/) into a rule."""
+    if len(pattern) > 2 and pattern.startswith("/") and pattern.endswith("/"):
+        return UrlRule(re.compile(pattern[1:-1], re.IGNORECASE), None)
+    host_key = None
+    # Globs with a literal host can still be indexed, e.g. http*://wiki.example/*
+    literal = re.match(r"^[a-z*]+://([^/*]+)/", pattern, re.IGNORECASE)
+    if literal:
+        host_key = ("exact", literal.group(1).lower().split(":")[0])
+    elif (wildcard := re.match(r"^[a-z*]+://\*\.([^/*]+)/", pattern, re.IGNORECASE)):
+        host_key = ("suffix", wildcard.group(1).lower())
+    return UrlRule(_glob_to_regex(pattern), host_key)
+
+
+@dataclass
+class UserScript:
+    name: str
+    path: str
+    source: str
+    run_at: str = "document-idle"
+    inject_into_page: bool = False
+    no_frames: bool = False
+    includes: list[UrlRule] = field(default_factory=list)
+    excludes: list[UrlRule] = field(default_factory=list)
+    script: QWebEngineScript | None = None
+
+    def build_script(self) -> QWebEngineScript:
+        """Builds (once) the QWebEngineScript registered into page collections."""
+        if self.script is None:
+            script = QWebEngineScript()
+            script.setName(SCRIPT_NAME_PREFIX + os.path.basename(self.path)) # File names are unique, @name may not be
+            script.setInjectionPoint(RUN_AT.get(self.run_at, RUN_AT["document-idle"]))
+            script.setWorldId(QWebEngineScript.ScriptWorldId.MainWorld if self.inject_into_page
+                              else QWebEngineScript.ScriptWorldId.ApplicationWorld)
+            script.setRunsOnSubFrames(not self.no_frames)
+            # Each script runs in its own function scope so scripts cannot clobber each other's globals
+            script.setSourceCode(f"(function() {{\n{self.source}\n}})();")
+            self.script = script
+        return self.script
+
+
+def parse_user_script(path: str, source: str) -> UserScript | None:
+    block = _METADATA_RE.search(source)
+    if not block:
+        return None
+    script = UserScript(name=os.path.basename(path), path=path, source=source)
+    for key, value in _METADATA_LINE_RE.findall(block.group(1)):
+        value = value.strip()
+        if key == "name" and value:
+            script.name = value
+        elif key == "match":
+            rule = compile_match_pattern(value)
+            if rule is None:
+                print(f"User script {path}: ignoring invalid @match {value!r}")
+            else:
+                script.includes.append(rule)
+        elif key == "include" and value:
+            script.includes.append(compile_include(value))
+        elif key == "exclude" and value:
+            script.excludes.append(compile_include(value))
+        elif key == "exclude-match":
+            if (rule := compile_match_pattern(value)) is not None:
+                script.excludes.append(rule)
+        elif key == "run-at" and value in RUN_AT:
+            script.run_at = value
+        elif key == "inject-into":
+            script.inject_into_page = value == "page"
+        elif key == "noframes":
+            script.no_frames = True
+    return script
+
+
+class UserScriptIndex:
+    """Maps hosts to the (rule, script) pairs that can possibly match them."""
+    def __init__(self, scripts: list[UserScript]):
+        self.exact = {}
+        self.suffix = {}
+        self.any_host = []
+        for order, script in enumerate(scripts):
+            for rule in script.includes:
+                entry = (order, rule, script)
+                if rule.host_key is None:
+                    self.any_host.append(entry)
+                elif rule.host_key[0] == "exact":
+                    self.exact.setdefault(rule.host_key[1], []).append(entry)
+                else:
+                    self.suffix.setdefault(rule.host_key[1], []).append(entry)
+
+    def candidates(self, host: str) -> list[tuple]:
+        found = list(self.exact.get(host, ()))
+        labels = host.split(".")
+        for start in range(len(labels)):
+            found += self.suffix.get(".".join(labels[start:]), ())
+        return found + self.any_host
+
+    def match(self, url: QUrl) -> list[UserScript]:
+        """Scripts applying to the URL, in load order."""
+        url_text = url.toString()
+        matched = {}
+        for order, rule, script in self.candidates(url.host().lower()):
+            if order not in matched and rule.matches(url_text):
+                if not any(exclude.matches(url_text) for exclude in script.excludes):
+                    matched[order] = script
+        return [matched[order] for order in sorted(matched)]
+
+
+def same_script(registered: QWebEngineScript, built: QWebEngineScript | None) -> bool:
+    return (built is not None and registered.sourceCode() == built.sourceCode()
+            and registered.injectionPoint() == built.injectionPoint() and registered.worldId() == built.worldId()
+            and registered.runsOnSubFrames() == built.runsOnSubFrames())
+
+
+class UserScriptManager(QObject):
+    """Loads user scripts, keeps their sources cached and registers them per navigation."""
+    def __init__(self, directory: str, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self.scripts = []
+        self.index = UserScriptIndex([])
+        self._cache = {} # path -> (mtime, UserScript)
+        self.navigations = 0
+        self.total_match_us = 0.0
+        self.max_match_us = 0.0
+        self.last_match_us = 0.0
+        self.reload()
+
+    def reload(self):
+        """Re-reads the scripts folder; unchanged files are served from the cache."""
+        os.makedirs(self.directory, exist_ok=True)
+        cache = {}
+        for path in sorted(glob.glob(os.path.join(self.directory, "*.user.js"))):
+            try:
+                mtime = os.path.getmtime(path)
+                cached = self._cache.get(path)
+                if cached and cached[0] == mtime:
+                    cache[path] = cached
+                    continue
+                with open(path, encoding="utf-8") as f:
+                    script = parse_user_script(path, f.read())
+            except OSError as e:
+                print(f"Could not read user script {path}: {e}")
+                continue
+            if script is None:
+                print(f"User script {path} has no ==UserScript== metadata block; skipped.")
+                continue
+            cache[path] = (mtime, script)
+        self._cache = cache
+        self.scripts = [script for _, script in cache.values()]
+        self.index = UserScriptIndex(self.scripts)
+        if self.scripts:
+            print(f"Loaded {len(self.scripts)} user script(s) from {self.directory}")
+
+    def apply(self, page: QWebEnginePage, url: QUrl):
+        """Registers exactly the scripts matching `url` in the page's script collection."""
+        started = time.perf_counter()
+        wanted = {built.name(): built for built in (script.build_script() for script in self.index.match(url))}
+        collection = page.scripts()
+        for registered in collection.toList():
+            # Registrations from before a reload() keep the old source; replace them
+            if registered.name().startswith(SCRIPT_NAME_PREFIX) and not same_script(registered, wanted.get(registered.name())):
+                collection.remove(registered)
+        for name, built in wanted.items():
+            if not collection.find(name):
+                collection.insert(built)
+
+        elapsed_us = (time.perf_counter() - started) * 1_000_000
+        self.navigations += 1
+        self.total_match_us += elapsed_us
+        self.last_match_us = elapsed_us
+        self.max_match_us = max(self.max_match_us, elapsed_us)
+
+    def stats(self) -> dict:
+        """Per-navigation matching cost, including the script collection update."""
+        return {
+            "scripts": len(self.scripts),
+            "navigations": self.navigations,
+            "last_match_us": round(self.last_match_us, 1),
+            "mean_match_us": round(self.total_match_us / self.navigations, 1) if self.navigations else None,
+            "max_match_us": round(self.max_match_us, 1),
+        }
+
+
+_shared_manager = None
+
+
+def shared_user_script_manager() -> UserScriptManager:
+    """The application-wide manager reading the `userscripts` folder of the user data directory."""
+    global _shared_manager
+    if _shared_manager is None:
+        from paths import app_data_dir
+        _shared_manager = UserScriptManager(os.path.join(app_data_dir(), "userscripts"))
+    return _shared_manager
@@ -13,18 +13,33 @@ class CustomWebEnginePage(QWebEnginePage):
     and feature permissions.
     """
 
-    def __init__(self, profile: QWebEngineProfile, main_window_ref: 'WebBrowserWindow', browser_view_parent: 'QWebEngineView'): # type: ignore
+    def __init__(self, profile: QWebEngineProfile, main_window_ref: 'WebBrowserWindow | None', browser_view_parent: 'QWebEngineView | None'): # type: ignore
         super().__init__(profile, browser_view_parent)
         self.main_window_ref = main_window_ref 
+        self.data_saver = None
+        if (data_saver := getattr(main_window_ref, 'data_saver', None)) is not None:
+            data_saver.attach(self) # Sets self.data_saver to the page's interceptor and counters
         self.featurePermissionRequested.connect(self.handle_feature_permission)
         self.setBackgroundColor(Qt.GlobalColor.white) 
 
+    def acceptNavigationRequest(self, url: QUrl, _type: QWebEnginePage.NavigationType, is_main_frame: bool) -> bool:
+        """Applies per-site user scripts and data saving to a main-frame navigation before it commits."""
+        if is_main_frame:
+            if (user_scripts := getattr(self.main_window_ref, 'user_scripts', None)) is not None:
+                user_scripts.apply(self, url)
+            if (data_saver := getattr(self.main_window_ref, 'data_saver', None)) is not None:
+                data_saver.apply(self, url)
+        return super().acceptNavigationRequest(url, _type, is_main_frame)
+
     def createWindow(self, _type: QWebEnginePage.WebWindowType) -> QWebEnginePage | None:
         """
         Handles requests from web content to create a new window.
         (e.g., target="_blank" links or window.open()).
         This implementation creates a new tab in the main browser window.
+        Pages without a main window (e.g. headless rendering) refuse pop-ups.
         """
+        if self.main_window_ref is None:
+            return None
   
         if _type in [QWebEnginePage.WebWindowType.WebBrowserTab, 
                        QWebEnginePage.WebWindowType.WebBrowserWindow, 
@@ -48,7 +63,7 @@ class CustomWebEnginePage(QWebEnginePage):
         if feature in [QWebEnginePage.Feature.MouseLock, QWebEnginePage.Feature.FullScreen]:
             permission_policy = QWebEnginePage.PermissionPolicy.PermissionGrantedByUser
             print(f"Auto-granting permission for {feature_name} to {url.host()}")
-        elif feature == QWebEnginePage.Feature.Geolocation:
+        elif feature == QWebEnginePage.Feature.Geolocation and self.view() is not None:
 
             reply = QMessageBox.question(self.view().window(), "Location Permission",
                                          f"Allow {url.host()} to access your location?",